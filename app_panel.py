@@ -9,17 +9,24 @@ import panel as pn
 from ui.theme import template
 from ui.toolbar import toolbar, _refresh_status, status_label
 from ui.subscriptions import subs_card
-from ui.letras_tab import letras_tab, letras_tabulator, letras_md
+from ui.table_sync import push_frame
+from ui.letras_tab import letras_tab, letras_tabulator, letras_md, letras_book_cb
 from ui.ggal_tab import (
-    ggal_tab, ggal_tabulator, days_input, r_input, q_input,
+    ggal_tab, ggal_tabulator, days_input, r_input, q_input, greeks_cb, book_cb, set_iv_range,
     calls_ms, puts_ms, refresh_gal_option_lists, ensure_underlying_sub
 )
-from letras import build_letras_df, LETRAS_CHART
 from ggal import get_underlying_last_and_var, get_mep_last_and_var, ensure_mep_sub
-from mae import get_usd_may_from_mae
+from mae import get_usd_may_from_mae, get_usd_may_age
 from utils import fmt_thousand, bcra_bands_for_date, to_float
-from connection import connect_pyrofex, drain_queue
-from config import UNDERLYING_GGAL
+from connection import connect_pyrofex, auto_subscribe_after_connect
+from engine import ENGINE
+from letras import LETRAS_BOOK_COLS
+from config import (UNDERLYING_GGAL, REPLAY_FILE, REPLAY_SPEED, METRICS_PORT, INGEST_PROCESS,
+                    RENDER_MIN_INTERVAL_MS, RENDER_MAX_DELAY_MS, RENDER_IDLE_MS)
+from scheduler import RenderScheduler
+from metrics import METRICS
+from state import STATE
+import time
 from datetime import date
 
 pn.extension("tabulator", sizing_mode="stretch_width", notifications=True)
@@ -31,27 +38,51 @@ template.main.append(ggal_tab)
 template.main.append(pn.Spacer(height=8))
 template.main.append(subs_card)
 
+_LAST_TABLES_SIG = None
+_SMILE_PENDING = False
+
 def update_all():
-    drain_queue(4000)
+    t0 = time.perf_counter()
+    _update_all()
+    dt = time.perf_counter() - t0
+    METRICS.observe("update_all", dt)
+    if dt*1000.0 > RENDER_MAX_DELAY_MS: METRICS.inc("cycle_overruns")
+    # si el engine no drenó todo (otra sesión acaba de hacer tick) queda otro ciclo
+    if SCHEDULER is not None and STATE.msg_queue is not None and STATE.msg_queue.qsize():
+        SCHEDULER.notify()
+
+def _update_all():
+    global _LAST_TABLES_SIG, _SMILE_PENDING
+    ENGINE.tick()
     _refresh_status()
-    refresh_gal_option_lists()
-    ensure_mep_sub()
-    ensure_underlying_sub()
 
-    # --- Letras: tabla + gráfico ---
-    df_letras = build_letras_df()
-    letras_tabulator.value = df_letras
-    letras_tabulator.height = 44 + max(len(df_letras), 1) * 30
-    LETRAS_CHART.update(df_letras)
-
-    # --- GGAL Opciones ---
     days = max(int(days_input.value or 30), 1)
     r    = float(r_input.value or 60.0)
     q    = float(q_input.value or 0.0)
-    from ggal import build_gal_options_df  # lazy import para evitar ciclos
-    df_opt = build_gal_options_df(list(calls_ms.value), list(puts_ms.value), r, q, days)
-    ggal_tabulator.value = df_opt
-    ggal_tabulator.height = 44 + max(len(df_opt), 1) * 30
+    calls, puts = list(calls_ms.value), list(puts_ms.value)
+    greeks = bool(greeks_cb.value)
+    book, letras_book = bool(book_cb.value), bool(letras_book_cb.value)
+
+    # Sin ticks nuevos ni cambios de parámetros no se rehacen tablas
+    # (un smile pendiente se sigue ajustando en el latido del scheduler, sin ticks nuevos)
+    sig = (ENGINE.letras_version, STATE.md.seq, tuple(calls), tuple(puts), days, r, q, greeks, book, letras_book)
+    if sig != _LAST_TABLES_SIG or _SMILE_PENDING:
+        _LAST_TABLES_SIG = sig
+
+        # --- Letras: tabla (el gráfico lo actualiza el engine) ---
+        df_letras = ENGINE.letras_df
+        if not letras_book: df_letras = df_letras.drop(columns=LETRAS_BOOK_COLS)
+        with METRICS.stage("render_letras"):
+            push_frame(letras_tabulator, df_letras, key="Instrumento")
+            letras_tabulator.height = 44 + max(len(df_letras), 1) * 30
+
+        # --- GGAL Opciones ---
+        df_opt = ENGINE.options_df(calls, puts, r, q, days, greeks=greeks, book=book)
+        with METRICS.stage("render_opciones"):
+            push_frame(ggal_tabulator, df_opt, key="Strike")
+            set_iv_range(*df_opt.attrs["iv_range"])
+            _SMILE_PENDING = df_opt.attrs["smile_pending"]
+            ggal_tabulator.height = 44 + max(len(df_opt), 1) * 30
 
     # --- Barra GGAL ---
     S0, Svar = get_underlying_last_and_var(UNDERLYING_GGAL)
@@ -81,8 +112,12 @@ def update_all():
         col = "#2ecc71" if vv > 0 else ("#e74c3c" if vv < 0 else "#000000")
         mep_var_html = f"<span class='value' style='color:{col};font-weight:700'>{txt}</span>"
 
-    usd_last, usd_var = get_usd_may_from_mae(cache_seconds=30)
+    with METRICS.stage("mae"):
+        usd_last, usd_var = get_usd_may_from_mae(cache_seconds=30)
     usd_last_txt = "—" if usd_last is None else fmt_thousand(usd_last, 2)
+    usd_age = get_usd_may_age()
+    if usd_last is not None and usd_age is not None and usd_age > 90:
+        usd_last_txt += f" <span class='label'>(hace {int(usd_age)}s)</span>"
     if usd_var is None:
         usd_var_html = "<span class='value'>—</span>"
     else:
@@ -105,11 +140,39 @@ def update_all():
         f"<span class='value'>{fmt_thousand(techo_hoy,2)}</span>"
     )
 
-pn.state.add_periodic_callback(update_all, period=500, start=True)
+# Render por eventos: el ingest avisa y el scheduler agrupa; sin documento
+# (p.ej. fuera de `panel serve`) queda el callback periódico de siempre
+SCHEDULER = None
+if pn.state.curdoc is not None:
+    SCHEDULER = RenderScheduler(pn.state.curdoc, update_all,
+                                min_interval=RENDER_MIN_INTERVAL_MS/1000.0,
+                                max_delay=RENDER_MAX_DELAY_MS/1000.0,
+                                idle=RENDER_IDLE_MS/1000.0).start()
+    _watchers = [(w, w.param.watch(lambda e: SCHEDULER.notify(), "value"))
+                 for w in (days_input, r_input, q_input, calls_ms, puts_ms, greeks_cb, book_cb, letras_book_cb)]
+    def _on_destroyed(ctx):
+        SCHEDULER.stop()
+        for w, watcher in _watchers: w.param.unwatch(watcher)
+    pn.state.on_session_destroyed(_on_destroyed)
+else:
+    pn.state.add_periodic_callback(update_all, period=RENDER_IDLE_MS, start=True)
+METRICS.start_http(METRICS_PORT)
 
 def _boot():
-    connect_pyrofex()
-    refresh_gal_option_lists()
+    if REPLAY_FILE:
+        if not STATE.replay:  # un solo replayer para todas las sesiones
+            from replay import Replayer
+            Replayer(REPLAY_FILE, speed=REPLAY_SPEED).start()
+    elif INGEST_PROCESS:
+        from ingest import start_ingest
+        start_ingest()
+        auto_subscribe_after_connect()  # el hijo ya suscribe lo guardado; acá se refleja en STATE
+        # el libro L2 vive sólo en el proceso de ingest: acá las columnas quedarían vacías
+        book_cb.value = letras_book_cb.value = False
+        book_cb.visible = letras_book_cb.visible = False
+    else:
+        connect_pyrofex()
+    refresh_gal_option_lists(force=True)
     _refresh_status()
     ensure_mep_sub()
     ensure_underlying_sub()
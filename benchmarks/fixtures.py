@@ -0,0 +1,71 @@
+"""Market data sintética para los benchmarks (sin red ni broker)."""
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+
+from config import VTO_MAP, FINISH_MAP, UNDERLYING_GGAL, UNDERLYING_MEP_A, UNDERLYING_MEP_B
+from md_store import MarketDataStore
+from md_buffer import CoalescingBuffer
+from state import STATE
+
+S0_GGAL = 6500.0
+
+def reset_state() -> None:
+    """Deja STATE vacío sin reemplazar el objeto (los módulos lo importan por nombre)."""
+    STATE.md = MarketDataStore()
+    STATE.msg_queue = CoalescingBuffer()
+    STATE.md_count = 0
+    STATE.md_applied = 0
+    STATE.subscribed_set.clear()
+    STATE.subscribed_order.clear()
+
+def md_message(sym: str, last: float, spread: float = 0.005, size: int = 100) -> Dict[str, Any]:
+    return {"instrumentId": {"symbol": sym, "marketId": "ROFX"},
+            "marketData": {"LA": {"price": last, "size": size},
+                           "BI": [{"price": round(last*(1-spread), 3), "size": size}],
+                           "OF": [{"price": round(last*(1+spread), 3), "size": size}],
+                           "CL": {"price": round(last*0.99, 3)}}}
+
+def payload(msg: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": "marketData", "data": msg}
+
+def letras_universe(n: int, seed: int = 7) -> List[str]:
+    """n letras sintéticas (con VTO y FINISH registrados) además de las reales."""
+    rng = random.Random(seed)
+    syms = []
+    for i in range(n):
+        ticker = f"X{i:03d}B"
+        vto = date.today() + timedelta(days=rng.randint(10, 700))
+        VTO_MAP.setdefault(ticker, f"{vto.year}-{vto.month}-{vto.day}")
+        FINISH_MAP.setdefault(ticker, rng.uniform(110, 180))
+        syms.append(f"MERV - XMEV - {ticker} - 24hs")
+    return syms
+
+def option_chain(n_strikes: int) -> Tuple[List[str], List[str]]:
+    """Calls y puts GGAL con n_strikes strikes alrededor de S0_GGAL."""
+    lo, hi = S0_GGAL*0.5, S0_GGAL*1.5
+    step = (hi - lo) / max(n_strikes - 1, 1)
+    ks = [int(round((lo + i*step)*10)) for i in range(n_strikes)]
+    calls = [f"MERV - XMEV - GFGC{k}OC - 24hs" for k in ks]
+    puts  = [f"MERV - XMEV - GFGV{k}OC - 24hs" for k in ks]
+    return calls, puts
+
+def option_quote(sym: str, S: float = S0_GGAL, rng: random.Random = random) -> float:
+    k = int("".join(ch for ch in sym.split(" - ")[2] if ch.isdigit())) / 10.0
+    intrinsic = max(S - k, 0.0) if "GFGC" in sym else max(k - S, 0.0)
+    return round(intrinsic + S*0.04*rng.uniform(0.6, 1.4), 2)
+
+def load_underlyings() -> None:
+    from connection import update_md_from_payload
+    for sym, px in ((UNDERLYING_GGAL, S0_GGAL), (UNDERLYING_MEP_A, 80000.0), (UNDERLYING_MEP_B, 60.0)):
+        update_md_from_payload(payload(md_message(sym, px)))
+
+def message_stream(syms: List[str], n: int, seed: int = 11) -> List[Dict[str, Any]]:
+    """n mensajes crudos repartidos entre syms (sesgo hacia los primeros, como en vivo)."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        sym = syms[min(int(rng.expovariate(4.0/len(syms))), len(syms)-1)]
+        px = option_quote(sym, rng=rng) if "GFG" in sym else rng.uniform(90, 110)
+        out.append(md_message(sym, px))
+    return out
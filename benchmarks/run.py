@@ -0,0 +1,193 @@
+"""Benchmarks de los hot paths de ingest y armado de tablas.
+
+    python -m benchmarks.run                  # corre todo e imprime
+    python -m benchmarks.run -k options       # sólo los casos que contienen "options"
+    python -m benchmarks.run --save           # guarda bench_results/<commit>.json
+    python -m benchmarks.run --compare A.json B.json [--threshold 0.10]
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks import fixtures as fx
+from state import STATE
+
+RESULTS_DIR = Path(__file__).resolve().parent.parent / "bench_results"
+
+# nombre -> (setup, items por iteración); setup devuelve la función a medir
+CASES: Dict[str, Tuple[Callable[[], Callable[[], Any]], int]] = {}
+
+def case(name: str, items: int = 1):
+    def deco(setup):
+        CASES[name] = (setup, items)
+        return setup
+    return deco
+
+# --- ingest ---
+for _n_msgs in (1000, 10000):
+    def _ingest(n=_n_msgs):
+        from connection import update_md_from_payload
+        fx.reset_state()
+        syms = fx.letras_universe(200)
+        msgs = [fx.payload(m) for m in fx.message_stream(syms, n)]
+        def run():
+            for p in msgs: update_md_from_payload(p)
+        return run
+    case(f"ingest.update_md_from_payload[{_n_msgs}]", _n_msgs)(_ingest)
+
+    def _drain(n=_n_msgs):
+        from connection import market_data_handler, drain_queue
+        fx.reset_state()
+        syms = fx.letras_universe(200)
+        msgs = fx.message_stream(syms, n)
+        def run():
+            for m in msgs: market_data_handler(m)
+            drain_queue(4000)
+        return run
+    case(f"ingest.handler+drain_queue[{_n_msgs}]", _n_msgs)(_drain)
+
+# --- IV ---
+def _implied_vol():
+    from ggal import implied_vol
+    rng = random.Random(3)
+    calls, puts = fx.option_chain(200)
+    jobs = [(fx.option_quote(s, rng=rng), s) for s in calls + puts]
+    def run():
+        for px, s in jobs:
+            k = int("".join(ch for ch in s.split(" - ")[2] if ch.isdigit())) / 10.0
+            implied_vol(px, fx.S0_GGAL, k, 30/365, 0.6, is_call="GFGC" in s)
+    return run
+case("iv.implied_vol[400]", 400)(_implied_vol)
+
+for _n_strikes in (20, 200, 2000):
+    def _options(n=_n_strikes, cold=True):
+        from connection import update_md_from_payload
+        import ggal
+        fx.reset_state(); fx.load_underlyings()
+        calls, puts = fx.option_chain(n)
+        syms = calls + puts
+        rng = random.Random(5)
+        for s in syms: update_md_from_payload(fx.payload(fx.md_message(s, fx.option_quote(s, rng=rng))))
+        changed = max(len(syms)//10, 1)
+        def run():
+            if cold:
+                ggal.IV_CACHE.clear(); ggal._OPT_ROW_CACHE.clear()
+            else:  # tick realista: ~10% de las opciones cotizan entre ciclos
+                for s in rng.sample(syms, changed):
+                    update_md_from_payload(fx.payload(fx.md_message(s, fx.option_quote(s, rng=rng))))
+            ggal.build_gal_options_df(calls, puts, 60.0, 0.0, 30)
+        return run
+    case(f"options.build_gal_options_df.cold[{_n_strikes}]", _n_strikes)(_options)
+    case(f"options.build_gal_options_df.tick[{_n_strikes}]", _n_strikes)(
+        lambda n=_n_strikes: _options(n, cold=False))
+
+# --- Letras ---
+for _n_letras in (10, 100, 500):
+    def _letras(n=_n_letras):
+        from connection import update_md_from_payload
+        from letras import build_letras_df
+        fx.reset_state(); fx.load_underlyings()
+        syms = fx.letras_universe(n)
+        STATE.subscribed_order.extend(syms); STATE.subscribed_set.update(syms)
+        rng = random.Random(9)
+        for s in syms: update_md_from_payload(fx.payload(fx.md_message(s, rng.uniform(90, 110))))
+        changed = max(n//10, 1)
+        def run():
+            for s in rng.sample(syms, changed):
+                update_md_from_payload(fx.payload(fx.md_message(s, rng.uniform(90, 110))))
+            build_letras_df()
+        return run
+    case(f"letras.build_letras_df.tick[{_n_letras}]", _n_letras)(_letras)
+
+def _chart():
+    from connection import update_md_from_payload
+    from letras import build_letras_df, letras_chart_points, LetrasChart
+    fx.reset_state(); fx.load_underlyings()
+    syms = fx.letras_universe(60)
+    STATE.subscribed_order.extend(syms); STATE.subscribed_set.update(syms)
+    rng = random.Random(13)
+    for s in syms: update_md_from_payload(fx.payload(fx.md_message(s, rng.uniform(90, 110))))
+    build_letras_df()
+    x, y, label = letras_chart_points()
+    chart = LetrasChart()
+    def run():  # un punto se mueve por ciclo, así siempre hay refit
+        y[rng.randrange(len(y))] += rng.uniform(-1, 1)
+        chart.update(x, y, label)
+    return run
+case("chart.LetrasChart.update[60]", 60)(_chart)
+
+# --- runner ---
+def measure(setup: Callable[[], Callable[[], Any]], items: int, min_time: float, min_iter: int) -> Dict[str, float]:
+    fn = setup()
+    fn()  # warm-up
+    samples: List[float] = []
+    t_end = time.perf_counter() + min_time
+    while len(samples) < min_iter or time.perf_counter() < t_end:
+        t = time.perf_counter(); fn(); samples.append(time.perf_counter() - t)
+        if len(samples) >= 10000: break
+    s = np.asarray(samples)
+    p50, p90, p99 = np.percentile(s, [50, 90, 99])
+    return {"n": int(s.size), "mean_ms": float(s.mean()*1e3), "p50_ms": float(p50*1e3),
+            "p90_ms": float(p90*1e3), "p99_ms": float(p99*1e3),
+            "items_per_s": float(items / s.mean()) if s.mean() > 0 else float("inf")}
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=RESULTS_DIR.parent, text=True).strip()
+    except Exception:
+        return "unknown"
+
+def run_all(pattern: Optional[str], min_time: float, min_iter: int) -> Dict[str, Any]:
+    results = {}
+    for name, (setup, items) in CASES.items():
+        if pattern and pattern not in name: continue
+        r = measure(setup, items, min_time, min_iter)
+        results[name] = r
+        print(f"{name:<48} p50={r['p50_ms']:9.3f}ms p90={r['p90_ms']:9.3f}ms "
+              f"p99={r['p99_ms']:9.3f}ms  {r['items_per_s']:12,.0f} items/s", flush=True)
+    return {"commit": _git_rev(), "python": platform.python_version(),
+            "numpy": np.__version__, "time": time.time(), "results": results}
+
+def compare(a_path: str, b_path: str, threshold: float) -> int:
+    a = json.loads(Path(a_path).read_text(encoding="utf-8"))
+    b = json.loads(Path(b_path).read_text(encoding="utf-8"))
+    print(f"{a['commit']} -> {b['commit']}  (regresión si p50 empeora más de {threshold:.0%})")
+    worse = 0
+    for name in sorted(set(a["results"]) & set(b["results"])):
+        pa, pb = a["results"][name]["p50_ms"], b["results"][name]["p50_ms"]
+        ratio = pb / pa if pa > 0 else float("inf")
+        flag = "REGRESIÓN" if ratio > 1 + threshold else ("mejora" if ratio < 1 - threshold else "")
+        worse += flag == "REGRESIÓN"
+        print(f"{name:<48} {pa:9.3f}ms -> {pb:9.3f}ms  x{ratio:5.2f} {flag}")
+    return 1 if worse else 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-k", dest="pattern", help="filtra casos por substring")
+    ap.add_argument("--min-time", type=float, default=1.0, help="segundos mínimos por caso")
+    ap.add_argument("--min-iter", type=int, default=5)
+    ap.add_argument("--save", nargs="?", const="", help="guarda resultados (default bench_results/<commit>.json)")
+    ap.add_argument("--compare", nargs=2, metavar=("BASE", "NUEVO"))
+    ap.add_argument("--threshold", type=float, default=0.10)
+    a = ap.parse_args(argv)
+    if a.compare:
+        return compare(a.compare[0], a.compare[1], a.threshold)
+    out = run_all(a.pattern, a.min_time, a.min_iter)
+    if a.save is not None:
+        path = Path(a.save) if a.save else RESULTS_DIR / f"{out['commit']}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(out, indent=2), encoding="utf-8")
+        print(f"guardado en {path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
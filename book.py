@@ -0,0 +1,102 @@
+import numpy as np
+from typing import Any, Dict, List, Sequence, Tuple
+
+SIDES = ("BI", "OF")  # lados del libro con la clave del mensaje de pyRofex
+
+class BookStore:
+    """Libro L2 de N niveles por símbolo: una fila por símbolo en arrays (filas x depth).
+
+    Cada mensaje pisa los niveles en el lugar (sin armar listas ni dicts por tick);
+    los niveles que ya no vienen quedan en NaN. Las consultas (VWAP para un tamaño,
+    profundidad acumulada) son vectorizadas sobre varios símbolos a la vez.
+    """
+    def __init__(self, depth: int = 5, capacity: int = 64):
+        self.depth = depth
+        self._index: Dict[str, int] = {}
+        self.px = {s: np.full((capacity, depth), np.nan) for s in SIDES}
+        self.sz = {s: np.full((capacity, depth), np.nan) for s in SIDES}
+        self.n  = {s: np.zeros(capacity, dtype=np.int64) for s in SIDES}  # niveles válidos
+
+    def row_of(self, sym: str) -> int:
+        row = self._index.get(sym)
+        if row is None:
+            row = len(self._index)
+            if row >= len(self.n["BI"]):
+                self._grow()
+            self._index[sym] = row
+        return row
+
+    def _grow(self) -> None:
+        cap = 2*len(self.n["BI"])
+        for s in SIDES:
+            for d in (self.px, self.sz):
+                new = np.full((cap, self.depth), np.nan); new[:len(d[s])] = d[s]
+                d[s] = new
+            n = np.zeros(cap, dtype=np.int64); n[:len(self.n[s])] = self.n[s]
+            self.n[s] = n
+
+    def update(self, sym: str, side: str, levels: List[Dict[str, Any]]) -> None:
+        """Reemplaza el lado `side` ("BI"/"OF") con los niveles del mensaje (mejor primero)."""
+        row = self.row_of(sym)
+        px, sz = self.px[side][row], self.sz[side][row]
+        k = 0
+        for lv in levels:
+            if k >= self.depth: break
+            try:
+                px[k] = float(lv.get("price")); sz[k] = float(lv.get("size"))
+            except Exception:
+                continue
+            k += 1
+        prev = int(self.n[side][row])
+        if prev > k:
+            px[k:prev] = np.nan; sz[k:prev] = np.nan
+        self.n[side][row] = k
+
+    def _rows(self, syms: Sequence[str]) -> np.ndarray:
+        get = self._index.get
+        return np.fromiter((get(s, -1) for s in syms), dtype=np.int64, count=len(syms))
+
+    def levels(self, sym: str, side: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(precios, tamaños) de los niveles válidos de un lado."""
+        row = self._index.get(sym)
+        if row is None: return np.empty(0), np.empty(0)
+        k = int(self.n[side][row])
+        return self.px[side][row, :k].copy(), self.sz[side][row, :k].copy()
+
+    def _take(self, syms: Sequence[str], side: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        idx = self._rows(syms)
+        miss = idx < 0
+        safe = np.where(miss, 0, idx)
+        px, sz = self.px[side][safe], self.sz[side][safe]
+        sz = np.where(np.isnan(sz) | miss[:, None], 0.0, sz)
+        return px, sz, miss
+
+    def depth_qty(self, syms: Sequence[str], side: str, levels: int = 0) -> np.ndarray:
+        """Tamaño acumulado en los primeros `levels` niveles (0 = todos); NaN sin libro."""
+        _px, sz, miss = self._take(syms, side)
+        if levels: sz = sz[:, :levels]
+        out = sz.sum(axis=1)
+        out[miss | (out == 0)] = np.nan
+        return out
+
+    def vwap(self, syms: Sequence[str], side: str, qty: float) -> np.ndarray:
+        """Precio promedio de ejecutar `qty` contra el lado `side` (BI = vender, OF = comprar).
+
+        NaN si el libro visible no alcanza para cubrir `qty`.
+        """
+        px, sz, miss = self._take(syms, side)
+        out = np.full(len(miss), np.nan)
+        if not qty or not (qty > 0) or not len(miss): return out
+        cum = np.cumsum(sz, axis=1)
+        fill = np.clip(qty - (cum - sz), 0.0, sz)  # lo que se toma de cada nivel
+        with np.errstate(all="ignore"):
+            notional = np.nansum(np.where(fill > 0, fill*px, 0.0), axis=1)
+            ok = ~miss & (cum[:, -1] >= qty)
+            out[ok] = notional[ok]/qty
+        return out
+
+    def __contains__(self, sym: object) -> bool:
+        return sym in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
@@ -22,6 +22,53 @@ WS_URL   = os.getenv("WS_URL",   "wss://api.veta.xoms.com.ar/")
 # --- Archivos locales ---
 SAVE_TICKERS   = Path(__file__).with_name("tickers_saved.txt")
 SAVE_PANEL_CFG = Path(__file__).with_name("panel_settings.json")
+INSTRUMENTS_CACHE = Path(__file__).with_name("instruments_cache.json")
+# Se bajan a disco tras este silencio sin cambios (o a lo sumo este retraso)
+PERSIST_QUIET_MS     = int(os.getenv("PERSIST_QUIET_MS", "500") or 500)
+PERSIST_MAX_DELAY_MS = int(os.getenv("PERSIST_MAX_DELAY_MS", "5000") or 5000)
+
+# Sembrar el registro de instrumentos con el listado del broker al conectar
+SEED_INSTRUMENTS = os.getenv("SEED_INSTRUMENTS", "0") == "1"
+
+# Journal de ticks crudos (vacío = desactivado)
+TICK_JOURNAL_DIR = os.getenv("TICK_JOURNAL_DIR", "")
+
+# Replay: segmento(s) grabado(s) a reproducir en lugar de conectarse (vacío = en vivo)
+REPLAY_FILE  = os.getenv("REPLAY_FILE", "")
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", "1") or 1)  # 0 = lo más rápido posible
+
+# Endpoint local de métricas (texto Prometheus en /metrics; 0 = desactivado)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108") or 0)
+
+# Render por eventos: intervalo mínimo entre renders, demora máxima de un tick a pantalla
+# y latido cuando no llega nada (refresca estado/MAE)
+RENDER_MIN_INTERVAL_MS = int(os.getenv("RENDER_MIN_INTERVAL_MS", "100") or 100)
+RENDER_MAX_DELAY_MS    = int(os.getenv("RENDER_MAX_DELAY_MS", "250") or 250)
+RENDER_IDLE_MS         = int(os.getenv("RENDER_IDLE_MS", "5000") or 5000)
+
+# Entradas mínimas del cache de IV (crece solo si la cadena pedida necesita más)
+IV_CACHE_SIZE = int(os.getenv("IV_CACHE_SIZE", "16384") or 16384)
+
+# Libro: niveles a suscribir por lado (1 = sólo top-of-book) y tamaño del VWAP de las columnas de libro
+MD_DEPTH = max(int(os.getenv("MD_DEPTH", "5") or 5), 1)
+BOOK_QTY = float(os.getenv("BOOK_QTY", "100") or 100)
+
+# Historia de ticks en memoria: slots por símbolo y tope de símbolos
+# (memoria máxima = HISTORY_LEN * HISTORY_MAX_SYMBOLS * 6 campos * 8 bytes)
+HISTORY_LEN         = max(int(os.getenv("HISTORY_LEN", "2048") or 2048), 1)
+HISTORY_MAX_SYMBOLS = max(int(os.getenv("HISTORY_MAX_SYMBOLS", "1024") or 1024), 1)
+
+# Reconexión: backoff máximo entre intentos; workers para los snapshots REST al conectar
+RECONNECT_MAX_BACKOFF_S = float(os.getenv("RECONNECT_MAX_BACKOFF_S", "30") or 30)
+SNAPSHOT_WORKERS        = max(int(os.getenv("SNAPSHOT_WORKERS", "8") or 8), 1)
+
+# Ingest en un proceso aparte con top-of-book en shared memory (1 = activado)
+INGEST_PROCESS   = os.getenv("INGEST_PROCESS", "0") == "1"
+INGEST_SHM_NAME  = os.getenv("INGEST_SHM_NAME", "pyrofex_panel_md")
+INGEST_CAPACITY  = int(os.getenv("INGEST_CAPACITY", "4096") or 4096)
+INGEST_CTRL_PORT = int(os.getenv("INGEST_CTRL_PORT", "9109") or 9109)
+# clave del canal de control; vacía = una aleatoria por corrida (los workers la leen del segmento)
+INGEST_AUTHKEY   = os.getenv("INGEST_AUTHKEY", "").encode("utf-8")
 
 # Underlyings
 UNDERLYING_GGAL  = "MERV - XMEV - GGAL - 24hs"
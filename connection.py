@@ -1,9 +1,17 @@
-import queue
+import math
+import threading
 import time
 import pyRofex
 from typing import Any, Dict, List
 from state import STATE
-from config import ENV, REST_URL, WS_URL, USUARIO, PASSWORD, CUENTA
+from md_store import NO_SIZE
+from md_buffer import CoalescingBuffer
+from journal import JOURNAL
+from metrics import METRICS
+from instruments import REGISTRY
+from scheduler import notify_data
+from supervisor import SUPERVISOR, warm_up
+from config import ENV, REST_URL, WS_URL, USUARIO, PASSWORD, CUENTA, SEED_INSTRUMENTS, MD_DEPTH
 from utils import save_tickers_list, load_saved_tickers
 import panel as pn
 
@@ -13,23 +21,31 @@ def _put(payload: Dict[str, Any]):
             STATE.msg_queue.put_nowait(payload)
         except Exception:
             pass
+        notify_data()
 
-def market_data_handler(message): _put({"type":"marketData","data":message})
+def _put_snapshot(payload: Dict[str, Any]):
+    if STATE.msg_queue:
+        STATE.msg_queue.put_snapshot(payload)
+        notify_data()
+
+def market_data_handler(message):
+    STATE.md_count += 1  # recibidos: el drain aplica menos (coalescidos por símbolo)
+    if JOURNAL is not None and not STATE.replay: JOURNAL.record(message)
+    _put({"type":"marketData","data":message})
 def order_report_handler(message): _put({"type":"orderReport","data":message})
 def error_handler(message):        _put({"type":"error","data":message})
-def exception_handler(e):          _put({"type":"exception","data":str(getattr(e,"message",repr(e)))})
-
-def connect_pyrofex():
-    if STATE.connected:
-        auto_subscribe_after_connect(); return
+def exception_handler(e):
+    _put({"type":"exception","data":str(getattr(e,"message",repr(e)))})
+    SUPERVISOR.poke()  # que revise el WebSocket ya, no en el próximo chequeo
 
+def _entries():
+    return [pyRofex.MarketDataEntry.LAST, pyRofex.MarketDataEntry.BIDS,
+            pyRofex.MarketDataEntry.OFFERS, pyRofex.MarketDataEntry.CLOSING_PRICE]
 
-    # Setear endpoints y abrir WS
+def _open_ws():
+    """Login (token nuevo) + WebSocket con los handlers de siempre."""
     pyRofex._set_environment_parameter("url", REST_URL, ENV)
     pyRofex._set_environment_parameter("ws",  WS_URL,   ENV)
-
-    STATE.msg_queue = queue.Queue()
-    print(f"[pyRofex] init: user={USUARIO}, account={CUENTA}, env={ENV}")
     pyRofex.initialize(USUARIO, PASSWORD, CUENTA, ENV)
     pyRofex.init_websocket_connection(
         market_data_handler=market_data_handler,
@@ -37,73 +53,178 @@ def connect_pyrofex():
         error_handler=error_handler,
         exception_handler=exception_handler
     )
+
+def ws_alive() -> bool:
+    try:
+        from pyRofex.components import globals as rfx
+        client = rfx.environment_config[ENV]["ws_client"]
+        return client is not None and client.is_connected()
+    except Exception:
+        return False
+
+def reconnect():
+    """Lo llama el supervisor con el WebSocket caído: reabre, resuscribe todo y pide snapshots.
+    Si nunca hubo conexión (falló el primer intento) hace la suscripción inicial."""
+    try: pyRofex.close_websocket_connection()
+    except Exception: pass
+    _open_ws()
+    if not ws_alive(): return
     STATE.connected = True
-    auto_subscribe_after_connect()
+    if STATE.subscribed_order:
+        pyRofex.market_data_subscription(tickers=list(STATE.subscribed_order), entries=_entries(), depth=MD_DEPTH)
+        warm_up(list(STATE.subscribed_order), _put_snapshot)
+    else:
+        _after_first_connect()
+    from ggal import ensure_mep_sub, ensure_underlying_sub  # ggal importa este módulo
+    ensure_mep_sub()
+    ensure_underlying_sub()
+    print("[pyRofex] reconectado")
+
+def connect_pyrofex():
+    if STATE.ingest is not None:  # el WebSocket vive en el proceso de ingest
+        STATE.ingest.send("connect"); return
+    if STATE.connected:
+        auto_subscribe_after_connect(); return
+    if SUPERVISOR.wanted: return  # ya está reintentando: las sesiones nuevas no reconectan de nuevo
+
+    STATE.msg_queue = CoalescingBuffer()
+    print(f"[pyRofex] init: user={USUARIO}, account={CUENTA}, env={ENV}")
+    SUPERVISOR.start()
+    try:
+        _open_ws()
+    except Exception as e:  # reintenta el supervisor con backoff y suscribe al conectar
+        print(f"[pyRofex] no se pudo conectar: {e}")
+        return
+    STATE.connected = True
+    _after_first_connect()
     print("[pyRofex] connected")
 
+def _after_first_connect():
+    if SEED_INSTRUMENTS:
+        threading.Thread(target=_seed_instruments, name="instruments-seed", daemon=True).start()
+    auto_subscribe_after_connect()
+
+def _seed_instruments():
+    try: print(f"[pyRofex] instrumentos registrados: {REGISTRY.seed_from_pyrofex()}")
+    except Exception as e: print(f"[pyRofex] no se pudo sembrar instrumentos: {e}")
+
 def disconnect_pyrofex():
+    if STATE.ingest is not None:
+        STATE.ingest.send("disconnect"); return
+    SUPERVISOR.stop()
     try: pyRofex.close_websocket_connection()
     except Exception: pass
     STATE.connected = False
     STATE.msg_queue = None
 
 def subscribe_list(tickers: List[str]):
-    if not STATE.connected: return
+    if not STATE.connected and not STATE.replay and STATE.ingest is None: return
     tickers = [t.strip() for t in tickers if t and t.strip()]
     new = [t for t in tickers if t not in STATE.subscribed_set]
     if not new: return
-    entries = [
-        pyRofex.MarketDataEntry.LAST,
-        pyRofex.MarketDataEntry.BIDS,
-        pyRofex.MarketDataEntry.OFFERS,
-        pyRofex.MarketDataEntry.CLOSING_PRICE
-    ]
-    pyRofex.market_data_subscription(tickers=new, entries=entries)
+    REGISTRY.register(new)
+    if STATE.ingest is not None:
+        STATE.ingest.send("subscribe", new)
+    elif not STATE.replay:
+        pyRofex.market_data_subscription(tickers=new, entries=_entries(), depth=MD_DEPTH)
+        warm_up(new, _put_snapshot)  # la tabla se llena sin esperar el primer tick
     STATE.subscribed_set.update(new)
+    STATE.universe_version += 1
     for t in new:
         if t not in STATE.subscribed_order:
             STATE.subscribed_order.append(t)
-    save_tickers_list(STATE.subscribed_order)
+    # el replay no pisa el listado guardado del modo en vivo; con ingest aparte guarda el hijo
+    if not STATE.replay and STATE.ingest is None:
+        save_tickers_list(STATE.subscribed_order)
 
 def unsubscribe_all():
-    if STATE.connected and STATE.subscribed_set:
+    if STATE.ingest is not None:
+        STATE.ingest.send("unsubscribe_all")
+    elif STATE.connected and STATE.subscribed_set:
         try: pyRofex.market_data_unsubscription(tickers=list(STATE.subscribed_set))
         except Exception: pass
     STATE.subscribed_set.clear()
     STATE.subscribed_order.clear()
-    save_tickers_list([])
+    STATE.universe_version += 1
+    if not STATE.replay and STATE.ingest is None: save_tickers_list([])
 
 def auto_subscribe_after_connect():
     saved = load_saved_tickers()
     if saved: subscribe_list(saved)
 
+def _num(x) -> float:
+    try: return float(x)
+    except Exception: return math.nan
+
+def _size(x) -> int:
+    try: return int(x)
+    except Exception: return NO_SIZE
+
+# último timestamp del exchange (epoch ms) aplicado por símbolo, para descartar snapshots viejos
+_EXCH_TS: Dict[str, float] = {}
+
+def _exchange_ts(payload: Dict[str, Any]) -> float:
+    """Hora del exchange del mensaje: `timestamp` del WebSocket o, en un snapshot REST,
+    la fecha más nueva de sus entradas; 0 si no trae ninguna."""
+    data = payload.get("data", {})
+    ts = data.get("timestamp")
+    if ts: return _num(ts)
+    best = 0.0
+    for v in data.get("marketData", {}).values():
+        for e in (v if isinstance(v, list) else [v]):
+            if isinstance(e, dict) and e.get("date"):
+                d = _num(e["date"])
+                if d > best: best = d
+    return best
+
 def update_md_from_payload(payload: Dict[str, Any]):
     data = payload.get("data", {})
     sym = data.get("instrumentId", {}).get("symbol")
     if not sym: return
+    ts = _exchange_ts(payload)
+    if ts > _EXCH_TS.get(sym, 0.0): _EXCH_TS[sym] = ts
     md = data.get("marketData", {})
     la = md.get("LA"); bi = md.get("BI"); ofr = md.get("OF"); cl = md.get("CL")
-    rec = STATE.md.get(sym, {
-        "LAST": None, "BID": None, "ASK": None, "CLOSE": None,
-        "BID_SIZE": None, "ASK_SIZE": None, "TS": None
-    })
-    if la:  rec["LAST"] = la.get("price")
-    if bi and isinstance(bi, list) and len(bi) > 0:
-        rec["BID"] = bi[0].get("price"); rec["BID_SIZE"] = bi[0].get("size")
-    if ofr and isinstance(ofr, list) and len(ofr) > 0:
-        rec["ASK"] = ofr[0].get("price"); rec["ASK_SIZE"] = ofr[0].get("size")
-    if cl:  rec["CLOSE"] = cl.get("price")
-    rec["TS"] = time.time()
-    STATE.md[sym] = rec
+    store = STATE.md
+    row = store.row_of(sym)
+    c = store.cols
+    store.begin(row)
+    try:  # el seqlock se cierra aunque el mensaje venga roto
+        if la:  c["LAST"][row] = _num(la.get("price"))
+        if isinstance(bi, list):
+            STATE.book.update(sym, "BI", bi)
+            if bi: c["BID"][row] = _num(bi[0].get("price")); c["BID_SIZE"][row] = _size(bi[0].get("size"))
+            else:  c["BID"][row] = math.nan; c["BID_SIZE"][row] = NO_SIZE  # lado vacío
+        if isinstance(ofr, list):
+            STATE.book.update(sym, "OF", ofr)
+            if ofr: c["ASK"][row] = _num(ofr[0].get("price")); c["ASK_SIZE"][row] = _size(ofr[0].get("size"))
+            else:   c["ASK"][row] = math.nan; c["ASK_SIZE"][row] = NO_SIZE
+        if cl:  c["CLOSE"][row] = _num(cl.get("price"))
+        c["TS"][row] = time.time()
+    finally:
+        store.touch(row)
+    STATE.history.record(sym, c, row)
+
+def _stale_snapshot(payload: Dict[str, Any]) -> bool:
+    """True si ya se aplicó un tick del exchange no más viejo que el snapshot. Sin fechas
+    en el snapshot vale la hora del pedido: el tick aplicado es posterior a eso."""
+    last = _EXCH_TS.get(payload["data"]["instrumentId"]["symbol"])
+    if last is None: return False
+    return last >= (_exchange_ts(payload) or payload.get("ts", 0.0)*1000.0)
 
 def drain_queue(limit=4000):
     if not STATE.msg_queue: return 0
     pulled = 0
-    while pulled < limit:
-        try: payload = STATE.msg_queue.get_nowait()
-        except queue.Empty: break
+    for payload in STATE.msg_queue.drain(limit):
         pulled += 1
-        if payload.get("type") == "marketData":
-            update_md_from_payload(payload)
-            STATE.md_count += 1
+        kind = payload.get("type")
+        try:
+            if kind == "marketData":
+                update_md_from_payload(payload)
+                STATE.md_applied += 1
+            elif kind == "snapshot" and not _stale_snapshot(payload):
+                update_md_from_payload(payload)
+        except Exception as e:  # un mensaje malo no corta el drain (ni mata al proceso de ingest)
+            METRICS.inc("md_errors")
+            print(f"[pyRofex] mensaje {kind!r} descartado: {e!r}")
     return pulled
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import List, Optional, Tuple
+import pandas as pd
+
+from state import STATE
+from connection import drain_queue
+from metrics import METRICS
+from config import RENDER_MIN_INTERVAL_MS
+from letras import build_letras_df, letras_chart_points, LETRAS_CHART
+from ggal import build_gal_options_df, refresh_gal_option_lists, ensure_mep_sub, ensure_underlying_sub
+
+class ComputeEngine:
+    """Pipeline único para todas las sesiones del server.
+
+    `tick()` drena el buffer y recalcula Letras + gráfico a lo sumo una vez por
+    `period`, lo llame quien lo llame. Las sesiones sólo renderizan el resultado;
+    la cadena de opciones se memoiza por set de parámetros (calls, puts, r, q, días, griegas, libro),
+    así dos sesiones con los mismos inputs comparten el cálculo.
+    """
+    def __init__(self, period: float = 0.45, max_param_sets: int = 16):
+        self.period = period
+        self.max_param_sets = max_param_sets
+        self._lock = threading.RLock()
+        self._last_tick = 0.0
+        self._letras_sig: Optional[tuple] = None
+        self.letras_df: pd.DataFrame = build_letras_df()
+        self.letras_version = 0
+        self._opt: "OrderedDict[tuple, Tuple[tuple, pd.DataFrame]]" = OrderedDict()
+        self.ticks = 0
+
+    def tick(self) -> bool:
+        """Avanza el pipeline si pasó `period` desde el último tick. True si corrió."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_tick < self.period:
+                return False
+            self._last_tick = now
+            self.ticks += 1
+            with METRICS.stage("drain"):
+                drain_queue(4000)
+            with METRICS.stage("listas"):
+                # sólo si cambió el universo: sin lecturas de disco ni updates de widgets por tick
+                if refresh_gal_option_lists():
+                    ensure_mep_sub()
+                    ensure_underlying_sub()
+
+            sig = (STATE.md.seq, tuple(STATE.subscribed_order), date.today())
+            if sig != self._letras_sig:
+                self._letras_sig = sig
+                with METRICS.stage("letras"):
+                    self.letras_df = build_letras_df()
+                self.letras_version += 1
+                with METRICS.stage("chart"):
+                    LETRAS_CHART.update(*letras_chart_points())
+            return True
+
+    def options_df(self, calls: List[str], puts: List[str], r: float, q: float, days: int,
+                   greeks: bool = False, book: bool = False) -> pd.DataFrame:
+        key = (tuple(calls), tuple(puts), r, q, days, greeks, book)
+        sig = (STATE.md.seq, date.today())
+        with self._lock:
+            hit = self._opt.get(key)
+            # un smile a medio ajustar se sigue en el próximo ciclo aunque no haya ticks
+            if hit is not None and hit[0] == sig and not hit[1].attrs.get("smile_pending"):
+                self._opt.move_to_end(key)
+                return hit[1]
+            with METRICS.stage("opciones"):
+                df = build_gal_options_df(list(calls), list(puts), r, q, days, greeks=greeks, book=book)
+            self._opt[key] = (sig, df)
+            self._opt.move_to_end(key)
+            while len(self._opt) > self.max_param_sets:
+                self._opt.popitem(last=False)
+            return df
+
+# el engine corre al menos tan seguido como el render más rápido permitido
+ENGINE = ComputeEngine(period=RENDER_MIN_INTERVAL_MS/1000.0*0.9)
@@ -1,35 +1,33 @@
 import math
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 
 from state import STATE
 from utils import to_float, fmt_thousand, save_panel_cfg
-from config import UNDERLYING_GGAL, UNDERLYING_MEP_A, UNDERLYING_MEP_B
+from config import UNDERLYING_GGAL, UNDERLYING_MEP_A, UNDERLYING_MEP_B, BOOK_QTY, IV_CACHE_SIZE
 from connection import subscribe_list
+from instruments import REGISTRY
+from smile import smile_for
 
 try:
     from scipy.stats import norm
+    from scipy.special import ndtr as ndist_vec
     def ndist(x: float) -> float: return float(norm.cdf(x))
 except Exception:
+    _erf_vec = np.vectorize(math.erf, otypes=[float])
     def ndist(x: float) -> float: return 0.5*(1.0+math.erf(x/math.sqrt(2)))
+    def ndist_vec(x): return 0.5*(1.0+_erf_vec(np.asarray(x, dtype=float)/math.sqrt(2)))
 
 def is_call_code(code: str) -> bool:
-    part = code.split("-")[2].strip() if " - " in code else code
-    return "C" in part.upper() and "V" not in part.upper()
+    return REGISTRY.get(code).is_call
 
 def is_put_code(code: str) -> bool:
-    part = code.split("-")[2].strip() if " - " in code else code
-    return "V" in part.upper()
+    return REGISTRY.get(code).is_put
 
 def parse_strike_from_code(code: str) -> Optional[float]:
-    try:
-        middle = code.split("-")[2].strip()
-        digits = "".join([ch for ch in middle if ch.isdigit()])
-        if not digits: return None
-        return int(digits) / 10.0
-    except Exception:
-        return None
+    return REGISTRY.get(code).strike
 
 def bs_price(S, K, T, r, sigma, is_call=True, q=0.0):
     if S<=0 or K<=0 or T<=0 or sigma<=0: return None
@@ -69,6 +67,151 @@ def implied_vol(price, S, K, T, r, is_call=True, q=0.0, lo=1e-4, hi=5.0, tol=1e-
         else: a = m; fa = fm
     return max(0.5*(a+b), 0.0)
 
+def _bs_price_vega_vec(S, K, T, r, sigma, is_call, q=0.0):
+    """Precio BS y vega sobre arrays (is_call: array bool). Sin validación de dominio."""
+    sqT = np.sqrt(T)
+    sv = sigma*sqT
+    d1 = (np.log(S/K) + (r - q + 0.5*sigma*sigma)*T) / sv
+    d2 = d1 - sv
+    dq = S*np.exp(-q*T); dr = K*np.exp(-r*T)
+    call = dq*ndist_vec(d1) - dr*ndist_vec(d2)
+    put  = dr*ndist_vec(-d2) - dq*ndist_vec(-d1)
+    vega = dq*np.exp(-0.5*d1*d1)/math.sqrt(2*math.pi)*sqT
+    return np.where(is_call, call, put), vega
+
+GREEKS = ("Delta", "Gamma", "Vega", "Theta", "Rho")
+
+def bs_greeks_vec(S, K, T, r, sigma, is_call, q=0.0) -> Dict[str, np.ndarray]:
+    """Griegas BS vectorizadas: vega por punto de vol, theta por día, rho por 1%."""
+    K = np.asarray(K, dtype=float); sigma = np.asarray(sigma, dtype=float)
+    is_call = np.asarray(is_call, dtype=bool)
+    with np.errstate(all="ignore"):
+        sqT = math.sqrt(T)
+        d1 = (np.log(S/K) + (r - q + 0.5*sigma*sigma)*T) / (sigma*sqT)
+        d2 = d1 - sigma*sqT
+        eq, er = math.exp(-q*T), math.exp(-r*T)
+        nd1 = np.exp(-0.5*d1*d1)/math.sqrt(2*math.pi)
+        Nd1, Nd2 = ndist_vec(d1), ndist_vec(d2)
+        decay = -S*eq*nd1*sigma/(2*sqT)
+        return {
+            "Delta": np.where(is_call, eq*Nd1, eq*(Nd1 - 1.0)),
+            "Gamma": eq*nd1/(S*sigma*sqT),
+            "Vega":  S*eq*nd1*sqT/100.0,
+            "Theta": np.where(is_call, decay - r*K*er*Nd2 + q*S*eq*Nd1,
+                              decay + r*K*er*(1.0 - Nd2) - q*S*eq*(1.0 - Nd1))/365.0,
+            "Rho":   np.where(is_call, K*T*er*Nd2, -K*T*er*(1.0 - Nd2))/100.0,
+        }
+
+def implied_vol_vec(prices, S, K, T, r, is_call, q=0.0, lo=1e-4, hi=5.0, tol=1e-4, maxit=60,
+                    sigma0=None) -> Tuple[np.ndarray, np.ndarray]:
+    """IV de toda la cadena de una vez: Newton con bracket y bisección de resguardo.
+
+    Mismo dominio que `implied_vol` (bracket [lo, hi] con hasta 5 duplicaciones de hi).
+    Devuelve (iv, converged); iv es NaN donde no hay solución.
+    """
+    price = np.asarray(prices, dtype=float)
+    K = np.broadcast_to(np.asarray(K, dtype=float), price.shape)
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+    iv = np.full(price.shape, np.nan)
+    converged = np.zeros(price.shape, dtype=bool)
+    if price.size == 0 or S is None or T is None or not (S > 0) or not (T > 0):
+        return iv, converged
+
+    with np.errstate(all="ignore"):
+        ok = np.isfinite(price) & (K > 0)
+        f_lo = _bs_price_vega_vec(S, K, T, r, lo, is_call, q)[0] - price
+        his = np.full(price.shape, float(hi))
+        f_hi = _bs_price_vega_vec(S, K, T, r, his, is_call, q)[0] - price
+        open_ = ok & (f_lo*f_hi > 0)
+        hi_try = float(hi)
+        for _ in range(5):
+            if not open_.any(): break
+            hi_try *= 2
+            f_try = _bs_price_vega_vec(S, K, T, r, hi_try, is_call, q)[0] - price
+            hit = open_ & (f_lo*f_try <= 0)
+            his[hit] = hi_try; f_hi[hit] = f_try[hit]
+            open_ &= ~hit
+        idx = np.flatnonzero(ok & ~open_ & np.isfinite(f_lo) & np.isfinite(f_hi))
+        if idx.size == 0:
+            return iv, converged
+
+        p, k, c = price[idx], K[idx], is_call[idx]
+        a = np.full(idx.size, float(lo)); b = his[idx]; fa = f_lo[idx]
+        s = np.sqrt(2*math.pi/T)*p/S  # Brenner-Subrahmanyam
+        if sigma0 is not None:
+            seed = np.broadcast_to(np.asarray(sigma0, dtype=float), price.shape)[idx]
+            s = np.where(np.isfinite(seed), seed, s)
+        bad = ~np.isfinite(s) | (s <= a) | (s >= b)
+        s[bad] = 0.5*(a[bad] + b[bad])
+        done = np.zeros(idx.size, dtype=bool)
+        for _ in range(maxit):
+            act = ~done
+            if not act.any(): break
+            f, vega = _bs_price_vega_vec(S, k[act], T, r, s[act], c[act], q)
+            f = f - p[act]
+            sa, sb, sfa, ss = a[act], b[act], fa[act], s[act]
+            left = sfa*f < 0
+            sb = np.where(left, ss, sb)
+            sa = np.where(left, sa, ss); sfa = np.where(left, sfa, f)
+            step = np.where(vega > 1e-12, f/np.where(vega > 1e-12, vega, 1.0), np.inf)
+            s_new = ss - step
+            small = np.abs(step) < tol*1e-3
+            bis = ~np.isfinite(s_new) | (s_new <= sa) | (s_new >= sb)
+            s_new = np.where(small | (f == 0), ss, np.where(bis, 0.5*(sa + sb), s_new))
+            fin = (f == 0) | small | ((sb - sa)/2 < tol)
+            a[act], b[act], fa[act], s[act] = sa, sb, sfa, s_new
+            done[np.flatnonzero(act)[fin]] = True
+        iv[idx] = np.maximum(s, 0.0)
+        converged[idx] = done
+    return iv, converged
+
+class IVCache:
+    """IV por (símbolo, lado) entre ticks: LRU acotado con contadores.
+
+    Un hit exige las mismas entradas (price, S, K, T, r, q, call); si sólo cambió
+    el mercado (precio, subyacente o tasa) devuelve la vol anterior como semilla.
+    """
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._d: "OrderedDict[Tuple[str, str], Tuple[tuple, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, sym: str, side: str, key: tuple) -> Tuple[Optional[float], float]:
+        """Devuelve (iv, semilla): iv no es None sólo en un hit; semilla es NaN si no hay."""
+        ent = self._d.get((sym, side))
+        if ent is not None:
+            self._d.move_to_end((sym, side))
+            if ent[0] == key:
+                self.hits += 1
+                return ent[1], math.nan
+        self.misses += 1
+        # key = (price, S, K, T, r, q, call): K, T, q y lado iguales -> warm start
+        if ent is not None and ent[0][2:4] == key[2:4] and ent[0][5:] == key[5:]:
+            return None, ent[1]
+        return None, math.nan
+
+    def reserve(self, n: int) -> None:
+        """Agranda el LRU para que entren `n` entradas (una cadena entera no debe pisarse sola)."""
+        if n > self.maxsize: self.maxsize = n
+
+    def store(self, sym: str, side: str, key: tuple, iv: float) -> None:
+        self._d[(sym, side)] = (key, iv)
+        self._d.move_to_end((sym, side))
+        while len(self._d) > self.maxsize:
+            self._d.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._d.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._d), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+IV_CACHE = IVCache(IV_CACHE_SIZE)
+
 def get_underlying_last_and_var(symbol=UNDERLYING_GGAL) -> Tuple[Optional[float], Optional[float]]:
     rec = STATE.md.get(symbol, {})
     last = to_float(rec.get("LAST"))
@@ -96,24 +239,67 @@ def ensure_mep_sub():
     if need:
         subscribe_list(need)
 
+GREEK_COLS = [f"{g} ({side})" for side in ("CALL", "PUT") for g in GREEKS]
+# libro por lado: profundidad acumulada y VWAP para BOOK_QTY contratos
+BOOK_COLS = [f"{c} ({side})" for side in ("CALL", "PUT")
+             for c in ("Prof. Bid", "VWAP Bid", "VWAP Ask", "Prof. Ask")]
+
+# Filas por strike: K -> ((símbolos, versiones md, S, T, r, q), fila sin formato)
+_OPT_ROW_CACHE: Dict[float, Tuple[tuple, Dict[str, Optional[float]]]] = {}
+
+_IV_SIDE_COLS = {side: (f"IV Ask ({side})", f"IV Bid ({side})") for side in ("CALL", "PUT")}
+_GREEK_NAMES = {side: [(g, f"{g} ({side})") for g in GREEKS] for side in ("CALL", "PUT")}
+
+def _fill_greeks(rows: List[dict], jobs: list, raw_iv: Dict[Tuple[int, str], float],
+                 S0: float, T: float, r: float, q: float) -> None:
+    """Griegas de cada lado con la vol media entre IV bid e IV ask ya resueltas (sin otro
+    solver): una sola pasada cerrada sobre toda la cadena."""
+    if not jobs: return
+    get, nan = raw_iv.get, math.nan
+    ia = np.fromiter((get((i, _IV_SIDE_COLS[s][0]), nan) for i, s, _k, _c in jobs), float, len(jobs))
+    ib = np.fromiter((get((i, _IV_SIDE_COLS[s][1]), nan) for i, s, _k, _c in jobs), float, len(jobs))
+    sig = np.where(np.isnan(ia), ib, np.where(np.isnan(ib), ia, 0.5*(ia + ib)))
+    greeks = bs_greeks_vec(S0, [j[2] for j in jobs], T, r, sig, [j[3] for j in jobs], q=q)
+    vals = {}
+    for g in GREEKS:
+        v = np.round(greeks[g], 6 if g == "Gamma" else 4)
+        vals[g] = np.where(np.isnan(v), None, v).tolist()
+    for n, (i, side, _k, _c) in enumerate(jobs):
+        row = rows[i]
+        for g, col in _GREEK_NAMES[side]:
+            row[col] = vals[g][n]
+
 def build_gal_options_df(calls: List[str], puts: List[str],
-                         r_annual_pct: float, q_div_yield_pct: float, days_to_expiry: int) -> pd.DataFrame:
+                         r_annual_pct: float, q_div_yield_pct: float, days_to_expiry: int,
+                         greeks: bool = False, book: bool = False) -> pd.DataFrame:
     S0, _ = get_underlying_last_and_var(UNDERLYING_GGAL)
     T = max(days_to_expiry, 1)/365.0
     r = r_annual_pct/100.0
     q = q_div_yield_pct/100.0
 
     all_syms = set(calls) | set(puts)
+    # bid + ask por símbolo, con margen para cambios de selección
+    IV_CACHE.reserve(4*len(all_syms))
     strikes: Dict[float, Dict[str, Optional[str]]] = {}
     for sym in sorted(all_syms):
-        K = parse_strike_from_code(sym)
+        info = REGISTRY.get(sym)
+        K = info.strike
         if K is None: continue
         d = strikes.setdefault(K, {"call": None, "put": None})
-        if is_call_code(sym): d["call"] = sym
-        elif is_put_code(sym): d["put"] = sym
+        if info.is_call: d["call"] = sym
+        elif info.is_put: d["put"] = sym
 
     rows = []
+    row_syms: List[Tuple[Optional[str], Optional[str]]] = []
+    iv_jobs: List[Tuple[int, str, str, float, float, bool]] = []  # (fila, columna, símbolo, precio, K, call)
+    greek_jobs: List[Tuple[int, str, float, bool]] = []  # (fila, lado, K, call)
     for K in sorted(strikes.keys()):
+        csym, psym = strikes[K]["call"], strikes[K]["put"]
+        row_syms.append((csym, psym))
+        key = (csym, psym, STATE.md.version(csym), STATE.md.version(psym), S0, T, r, q, greeks)
+        hit = _OPT_ROW_CACHE.get(K)
+        if hit is not None and hit[0] == key:
+            rows.append(hit[1]); continue
         row = {
             "CALL Ask": None, "IV Ask (CALL)": None, "Notas": None,
             "IV Bid (CALL)": None, "CALL Bid": None, "Pos CALLs": None,
@@ -121,82 +307,120 @@ def build_gal_options_df(calls: List[str], puts: List[str],
             "PUT Ask": None, "IV Ask (PUT)": None, "Notas 2": None,
             "IV Bid (PUT)": None, "PUT Bid": None
         }
-
-        csym = strikes[K]["call"]
-        if csym in STATE.md:
-            md = STATE.md[csym]
+        if greeks:
+            row.update({c: None for c in GREEK_COLS})
+        for side, is_call in (("CALL", True), ("PUT", False)):
+            sym = strikes[K]["call" if is_call else "put"]
+            if sym not in STATE.md: continue
+            md = STATE.md[sym]
             ask = to_float(md.get("BID")); bid = to_float(md.get("ASK"))
-            row["CALL Ask"] = None if ask is None else round(ask, 2)
-            row["CALL Bid"] = None if bid is None else round(bid, 2)
-            if S0 and ask:
-                iv_a = implied_vol(ask, S0, K, T, r, is_call=True, q=q)
-                row["IV Ask (CALL)"] = None if iv_a is None else round(iv_a*100.0, 2)
-            if S0 and bid:
-                iv_b = implied_vol(bid, S0, K, T, r, is_call=True, q=q)
-                row["IV Bid (CALL)"] = None if iv_b is None else round(iv_b*100.0, 2)
-
-        psym = strikes[K]["put"]
-        if psym in STATE.md:
-            md = STATE.md[psym]
-            ask = to_float(md.get("BID")); bid = to_float(md.get("ASK"))
-            row["PUT Ask"] = None if ask is None else round(ask, 2)
-            row["PUT Bid"] = None if bid is None else round(bid, 2)
-            if S0 and ask:
-                iv_a = implied_vol(ask, S0, K, T, r, is_call=False, q=q)
-                row["IV Ask (PUT)"] = None if iv_a is None else round(iv_a*100.0, 2)
-            if S0 and bid:
-                iv_b = implied_vol(bid, S0, K, T, r, is_call=False, q=q)
-                row["IV Bid (PUT)"] = None if iv_b is None else round(iv_b*100.0, 2)
-
+            row[f"{side} Ask"] = None if ask is None else round(ask, 2)
+            row[f"{side} Bid"] = None if bid is None else round(bid, 2)
+            if S0 and ask: iv_jobs.append((len(rows), f"IV Ask ({side})", sym, ask, K, is_call))
+            if S0 and bid: iv_jobs.append((len(rows), f"IV Bid ({side})", sym, bid, K, is_call))
+            if greeks and S0 and (ask or bid):
+                greek_jobs.append((len(rows), side, K, is_call))
+        _OPT_ROW_CACHE[K] = (key, row)
         rows.append(row)
+    if len(_OPT_ROW_CACHE) > len(strikes):
+        for K in set(_OPT_ROW_CACHE) - set(strikes):
+            del _OPT_ROW_CACHE[K]
+
+    raw_iv: Dict[Tuple[int, str], float] = {}  # sin redondear, para las griegas
+    def _put_iv(i: int, col: str, iv: float):
+        raw_iv[(i, col)] = iv
+        rows[i][col] = None if math.isnan(iv) else round(iv*100.0, 2)
+
+    misses, keys, seeds = [], [], []
+    for job in iv_jobs:
+        i, col, sym, price, K, is_call = job
+        key = (price, S0, K, T, r, q, is_call)
+        iv, seed = IV_CACHE.lookup(sym, col, key)
+        if iv is not None:
+            _put_iv(i, col, iv)
+        else:
+            misses.append(job); keys.append(key); seeds.append(seed)
+    if misses:
+        ivs, _ = implied_vol_vec([j[3] for j in misses], S0, [j[4] for j in misses], T, r,
+                                 [j[5] for j in misses], q=q, sigma0=seeds)
+        for (i, col, sym, _p, _k, _c), key, iv in zip(misses, keys, ivs.tolist()):
+            IV_CACHE.store(sym, col, key, iv)
+            _put_iv(i, col, iv)
+    if greek_jobs:
+        _fill_greeks(rows, greek_jobs, raw_iv, S0, T, r, q)
+
+    # Smile ajustado sobre la IV media de mercado por strike (calls y puts, bid y ask)
+    iv_cols = ["IV Ask (CALL)","IV Bid (CALL)","IV Ask (PUT)","IV Bid (PUT)"]
+    mkt = []
+    for row in rows:
+        v = [row[c] for c in iv_cols if row[c] is not None]
+        mkt.append(sum(v)/len(v) if v else None)
+    F = S0*math.exp((r - q)*T) if S0 else None
+    # un smile por vencimiento: strikes de distintos códigos no van al mismo ajuste
+    groups: Dict[str, List[int]] = {}
+    for i, (csym, psym) in enumerate(row_syms):
+        groups.setdefault(REGISTRY.get(csym or psym).expiry_code, []).append(i)
+    pending = False
+    for code, idx in groups.items():
+        fitter = smile_for(T, r, q, code)
+        fit = fitter.update([rows[i]["Strike"] for i in idx], [mkt[i] for i in idx], F, T)
+        pending |= fitter.pending
+        for i, f in zip(idx, fit.tolist()):
+            m = mkt[i]
+            rows[i]["IV Fit"] = None if math.isnan(f) else round(f, 2)
+            rows[i]["Residuo"] = None if (m is None or math.isnan(f)) else round(m - f, 2)
 
     cols = ["CALL Ask","IV Ask (CALL)","Notas","IV Bid (CALL)","CALL Bid","Pos CALLs",
-            "Strike","Pos PUTs","PUT Ask","IV Ask (PUT)","Notas 2","IV Bid (PUT)","PUT Bid"]
+            "Strike","IV Fit","Residuo","Pos PUTs","PUT Ask","IV Ask (PUT)","Notas 2","IV Bid (PUT)","PUT Bid"]
+    if greeks: cols += GREEK_COLS
     df = pd.DataFrame(rows, columns=cols)
+    if book:
+        # misma convención que las columnas de precio: "Ask" es el BI del exchange, "Bid" el OF
+        for n, side in enumerate(("CALL", "PUT")):
+            syms = [s[n] or "" for s in row_syms]
+            df[f"Prof. Bid ({side})"] = STATE.book.depth_qty(syms, "OF")
+            df[f"VWAP Bid ({side})"] = np.round(STATE.book.vwap(syms, "OF", BOOK_QTY), 2)
+            df[f"VWAP Ask ({side})"] = np.round(STATE.book.vwap(syms, "BI", BOOK_QTY), 2)
+            df[f"Prof. Ask ({side})"] = STATE.book.depth_qty(syms, "BI")
 
-    iv_cols = ["IV Ask (CALL)","IV Bid (CALL)","IV Ask (PUT)","IV Bid (PUT)"]
-    vals = []
-    for c in iv_cols:
-        if c in df: vals.extend([v for v in df[c].tolist() if isinstance(v,(int,float))])
-    vmin = min(vals) if vals else 10.0
-    vmax = max(vals) if vals else 150.0
+    # escala de color de IV: un solo rango por tabla (la UI lo pasa al CSS, no viaja por fila)
+    vals = df[iv_cols].to_numpy(dtype=float)
+    vals = vals[np.isfinite(vals)]
+    vmin = float(vals.min()) if vals.size else 10.0
+    vmax = float(vals.max()) if vals.size else 150.0
     if abs(vmax - vmin) < 1e-9: vmin, vmax = max(0.0, vmin-1.0), vmin+1.0
-
-    def _iv_color(value: float, vmin: float, vmax: float, invert: bool=False) -> str:
-        if value is None: return "#00000000"
-        t = 0.0 if vmax<=vmin else (value - vmin) / (vmax - vmin)
-        t = max(0.0, min(1.0, t))
-        if invert: t = 1.0 - t
-        r = int(46 + t*(231-46))
-        g = int(204 + t*(76-204))
-        b = int(113 + t*(60-113))
-        return f"#{r:02x}{g:02x}{b:02x}"
-
-    def _iv_html(v: Optional[float], vmin: float, vmax: float, invert: bool=False) -> str:
-        if v is None: return ""
-        c = _iv_color(v, vmin, vmax, invert=invert)
-        txt = f"{v:.2f}".replace(".", ",")
-        return f"<span class='iv-cell' style='background:{c}'>{txt}</span>"
-
-    for c in iv_cols:
-        if c in df: df[c] = df[c].apply(lambda v: _iv_html(v, vmin, vmax, invert=False))
+    df.attrs["iv_range"] = (vmin, vmax)
+    df.attrs["smile_pending"] = pending  # algún ajuste cortó por max_nfev: rehacer sin esperar ticks
     return df
 
-def refresh_gal_option_lists():
+# (versión del universo, símbolos con md) de la última vez que se armaron las listas
+_LISTS_SIG: Optional[Tuple[int, int]] = None
+
+def refresh_gal_option_lists(force: bool = False) -> bool:
+    """Rearma las opciones de los MultiSelect sólo si cambió el universo de símbolos.
+
+    True si las rehizo (el que llama aprovecha para asegurar las suscripciones base).
+    """
+    global _LISTS_SIG
+    sig = (STATE.universe_version, len(STATE.md))
+    if sig == _LISTS_SIG and not force:
+        return False
+    _LISTS_SIG = sig
     from utils import load_saved_tickers
     universe = set(STATE.md.keys()) | set(STATE.subscribed_order) | set(load_saved_tickers())
-    def _is_ggal_option(sym: str) -> bool:
-        if " - " not in sym: return False
-        middle = sym.split(" - ")[2].strip().upper()
-        return middle.startswith("GFGC") or middle.startswith("GFGV")
-    syms = sorted([s for s in universe if _is_ggal_option(s)])
+    infos = sorted((REGISTRY.get(s) for s in universe), key=lambda i: i.symbol)
+    syms = [i for i in infos if i.kind == "option" and i.underlying == "GGAL"
+            and i.ticker.upper().startswith(("GFGC", "GFGV"))]
     from ui.ggal_tab import calls_ms, puts_ms
-    all_calls = [s for s in syms if is_call_code(s)]
-    all_puts  = [s for s in syms if is_put_code(s)]
-    calls_ms.options = all_calls
-    puts_ms.options  = all_puts
-    calls_ms.value = [v for v in STATE.saved_calls if v in all_calls]
-    puts_ms.value  = [v for v in STATE.saved_puts  if v in all_puts]
+    all_calls = [i.symbol for i in syms if i.is_call]
+    all_puts  = [i.symbol for i in syms if i.is_put]
+    if list(calls_ms.options) != all_calls: calls_ms.options = all_calls
+    if list(puts_ms.options) != all_puts:   puts_ms.options  = all_puts
+    calls_sel = [v for v in STATE.saved_calls if v in all_calls]
+    puts_sel  = [v for v in STATE.saved_puts  if v in all_puts]
+    if list(calls_ms.value) != calls_sel: calls_ms.value = calls_sel
+    if list(puts_ms.value) != puts_sel:   puts_ms.value  = puts_sel
+    return True
 
 def ensure_underlying_sub():
     if UNDERLYING_GGAL not in STATE.subscribed_set:
@@ -0,0 +1,107 @@
+import numpy as np
+from typing import Dict, Mapping, Optional, Sequence
+
+from md_store import NO_SIZE
+
+HIST_FIELDS = ("TS", "LAST", "BID", "ASK", "BID_SIZE", "ASK_SIZE")
+
+class TickHistory:
+    """Historia intradiaria por símbolo en ring buffers NumPy preasignados.
+
+    Una fila por símbolo y `length` slots por fila para cada campo de HIST_FIELDS
+    (todo float, NaN = sin dato). `record()` pisa el slot más viejo sin asignar
+    memoria; la tabla crece duplicando filas hasta `max_symbols` y los símbolos que
+    sobran no se historizan. El tope de memoria es
+    max_symbols * length * len(HIST_FIELDS) * 8 bytes, corra lo que corra el proceso.
+    """
+    def __init__(self, length: int = 2048, max_symbols: int = 1024, capacity: int = 64):
+        self.length = length
+        self.max_symbols = max_symbols
+        self._index: Dict[str, int] = {}
+        cap = min(capacity, max_symbols)
+        self.cols = {f: np.full((cap, length), np.nan) for f in HIST_FIELDS}
+        self.head = np.zeros(cap, dtype=np.int64)  # ticks escritos en la fila (total)
+        self.dropped = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(c.nbytes for c in self.cols.values()) + self.head.nbytes
+
+    def _row(self, sym: str) -> int:
+        row = self._index.get(sym)
+        if row is None:
+            row = len(self._index)
+            if row >= self.max_symbols: return -1
+            if row >= len(self.head): self._grow()
+            self._index[sym] = row
+        return row
+
+    def _grow(self) -> None:
+        cap = min(2*len(self.head), self.max_symbols)
+        for f, col in self.cols.items():
+            new = np.full((cap, self.length), np.nan); new[:len(col)] = col
+            self.cols[f] = new
+        head = np.zeros(cap, dtype=np.int64); head[:len(self.head)] = self.head
+        self.head = head
+
+    def record(self, sym: str, md: Mapping[str, np.ndarray], md_row: int) -> None:
+        """Agrega el estado actual de la fila `md_row` del top-of-book (`md` = store.cols)."""
+        row = self._row(sym)
+        if row < 0:
+            self.dropped += 1
+            return
+        i = self.head[row] % self.length
+        c = self.cols
+        c["TS"][row, i]   = md["TS"][md_row]
+        c["LAST"][row, i] = md["LAST"][md_row]
+        c["BID"][row, i]  = md["BID"][md_row]
+        c["ASK"][row, i]  = md["ASK"][md_row]
+        v = md["BID_SIZE"][md_row]; c["BID_SIZE"][row, i] = np.nan if v == NO_SIZE else v
+        v = md["ASK_SIZE"][md_row]; c["ASK_SIZE"][row, i] = np.nan if v == NO_SIZE else v
+        self.head[row] += 1
+
+    def _order(self, rows: np.ndarray) -> np.ndarray:
+        """Índices de slot en orden cronológico (filas x length); los vacíos quedan al principio."""
+        return (self.head[rows][:, None] - self.length + np.arange(self.length)[None, :]) % self.length
+
+    def window(self, sym: str, t0: float, t1: Optional[float] = None,
+               fields: Sequence[str] = HIST_FIELDS) -> Dict[str, np.ndarray]:
+        """Ticks de `sym` con t0 <= TS <= t1, en orden cronológico (arrays vacíos si no hay)."""
+        row = self._index.get(sym)
+        if row is None:
+            return {f: np.empty(0) for f in fields}
+        n = int(min(self.head[row], self.length))
+        slots = (self.head[row] - n + np.arange(n)) % self.length
+        ts = self.cols["TS"][row, slots]
+        lo = np.searchsorted(ts, t0, side="left")
+        hi = n if t1 is None else np.searchsorted(ts, t1, side="right")
+        sel = slots[lo:hi]
+        return {f: self.cols[f][row, sel] for f in fields}
+
+    def asof(self, syms: Sequence[str], field: str, t: float) -> np.ndarray:
+        """Último valor de `field` con TS <= t para cada símbolo (NaN si no hay), vectorizado."""
+        get = self._index.get
+        rows = np.fromiter((get(s, -1) for s in syms), dtype=np.int64, count=len(syms))
+        out = np.full(len(rows), np.nan)
+        ok = rows >= 0
+        if not ok.any(): return out
+        r = rows[ok]
+        order = self._order(r)
+        ts = np.take_along_axis(self.cols["TS"][r], order, axis=1)
+        vals = np.take_along_axis(self.cols[field][r], order, axis=1)
+        hit = ts <= t                                     # NaN (vacío) compara False
+        last = self.length - 1 - np.argmax(hit[:, ::-1], axis=1)
+        res = vals[np.arange(len(r)), last]
+        res[~hit.any(axis=1)] = np.nan
+        out[ok] = res
+        return out
+
+    def change(self, syms: Sequence[str], field: str, seconds: float, now: float) -> np.ndarray:
+        """Valor actual menos el de hace `seconds` (NaN si falta alguno)."""
+        return self.asof(syms, field, now) - self.asof(syms, field, now - seconds)
+
+    def __contains__(self, sym: object) -> bool:
+        return sym in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
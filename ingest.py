@@ -0,0 +1,207 @@
+"""Ingest en un proceso aparte (INGEST_PROCESS=1).
+
+El proceso hijo corre connect_pyrofex + handlers + update_md_from_payload fuera del
+GIL de Panel y publica el top-of-book en un SharedMarketDataStore. Los procesos de UI
+(uno o varios workers de `panel serve --num-procs`) leen el segmento sin copiarlo y
+mandan conectar/suscribir por un canal de control local (multiprocessing.connection)
+autenticado con una clave por corrida; los comandos viajan como JSON, nunca pickle.
+"""
+import atexit
+import json
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from typing import Any, Optional, Tuple
+
+from state import STATE
+from md_shm import (SharedMarketDataStore, owner_alive, ingest_alive, KEY_BYTES,
+                    H_SEQ, H_CONNECTED, H_MDCOUNT, H_RECEIVED, H_DEPTH, H_PID)
+from scheduler import notify_data
+from config import INGEST_SHM_NAME, INGEST_CAPACITY, INGEST_CTRL_PORT, INGEST_AUTHKEY
+
+# --- canal de control ---
+_OPS = {"connect": 0, "disconnect": 0, "subscribe": 1, "unsubscribe_all": 0, "stop": 0}  # op -> n args
+
+def _encode(cmd: Tuple[Any, ...]) -> bytes:
+    return json.dumps(list(cmd)).encode("utf-8")
+
+def _decode(raw: bytes) -> Optional[Tuple[Any, ...]]:
+    """Comando de la lista blanca o None: ["op"] o ["subscribe", [símbolos...]]."""
+    try: cmd = json.loads(raw.decode("utf-8"))
+    except Exception: return None
+    if not isinstance(cmd, list) or not cmd or _OPS.get(cmd[0]) != len(cmd) - 1:
+        return None
+    if cmd[0] == "subscribe" and not (isinstance(cmd[1], list) and all(isinstance(t, str) for t in cmd[1])):
+        return None
+    return tuple(cmd)
+
+# --- proceso de ingest ---
+def _serve_control(cmds: "queue.Queue[Tuple[Any, ...]]", port: int, authkey: bytes) -> None:
+    with Listener(("127.0.0.1", port), authkey=authkey) as ls:
+        while True:
+            try:
+                with ls.accept() as conn:
+                    cmd = _decode(conn.recv_bytes(1 << 20))
+                if cmd is None: print("[ingest] comando de control inválido, descartado")
+                else: cmds.put(cmd)
+            except Exception:
+                continue
+
+def _apply(cmd: Tuple[Any, ...]) -> bool:
+    import connection as cx
+    op = cmd[0] if cmd else None
+    if op == "connect": cx.connect_pyrofex()
+    elif op == "disconnect": cx.disconnect_pyrofex()
+    elif op == "subscribe": cx.subscribe_list(list(cmd[1]))
+    elif op == "unsubscribe_all": cx.unsubscribe_all()
+    elif op == "stop": return False
+    return True
+
+def ingest_main(name: str, capacity: int, port: int, authkey: bytes, parent: int) -> None:
+    import connection as cx
+    store = SharedMarketDataStore(name, capacity, create=False)
+    STATE.md = store
+    store.hdr[H_PID] = os.getpid()
+    cmds: "queue.Queue[Tuple[Any, ...]]" = queue.Queue()
+    threading.Thread(target=_serve_control, args=(cmds, port, authkey),
+                     name="ingest-control", daemon=True).start()
+    cmds.put(("connect",))  # si falla, el supervisor reintenta; el hijo sigue vivo
+    running = True
+    while running and os.getppid() == parent:
+        try:
+            while running:
+                running = _apply(cmds.get_nowait())
+        except queue.Empty:
+            pass
+        except Exception as e:
+            print(f"[ingest] comando fallido: {e!r}")
+        n = cx.drain_queue(4000)  # cada mensaje con su try/except
+        buf = STATE.msg_queue
+        store.hdr[H_CONNECTED] = int(STATE.connected)
+        store.hdr[H_MDCOUNT] = STATE.md_count
+        store.hdr[H_RECEIVED] = buf.received if buf else 0
+        store.hdr[H_DEPTH] = buf.qsize() if buf else 0
+        if n == 0: time.sleep(0.002)
+    cx.disconnect_pyrofex()
+    store.hdr[H_CONNECTED] = 0
+    from persist import PERSIST
+    PERSIST.flush()  # el hijo guarda la lista de tickers
+
+# --- lado UI ---
+class IngestClient:
+    """Abre (o crea) el segmento compartido, lanza el proceso de ingest si es el primero
+    y refleja su estado en STATE; los ticks nuevos disparan `notify_data()`."""
+    def __init__(self, name: str = INGEST_SHM_NAME, capacity: int = INGEST_CAPACITY,
+                 port: int = INGEST_CTRL_PORT, authkey: bytes = INGEST_AUTHKEY, poll: float = 0.01):
+        self.name, self.capacity, self.port, self.authkey, self.poll = name, capacity, port, authkey, poll
+        # sin INGEST_AUTHKEY el dueño genera la clave y el resto de los workers la lee del segmento
+        self.store: Optional[SharedMarketDataStore] = None
+        self.proc: Optional[mp.Process] = None
+        self._out: "queue.Queue[Tuple[Any, ...]]" = queue.Queue()
+        self._stop = threading.Event()
+
+    def start(self) -> "IngestClient":
+        owner = True
+        key = b"" if self.authkey else os.urandom(KEY_BYTES//2).hex().encode("ascii")
+        try:
+            store = SharedMarketDataStore(self.name, self.capacity, create=True, key=key)
+        except FileExistsError:
+            store = SharedMarketDataStore(self.name, self.capacity, create=False)
+            owner = False
+            if not owner_alive(store):  # restos de una corrida anterior: su creador ya no está
+                store.close(unlink=True)
+                store = SharedMarketDataStore(self.name, self.capacity, create=True, key=key)
+                owner = True
+        if not self.authkey:
+            self.authkey = key if owner else store.key
+            if not self.authkey:
+                store.close()
+                raise RuntimeError("el segmento de ingest no trae clave de control: definir INGEST_AUTHKEY")
+        self.store = store
+        if owner:
+            ctx = mp.get_context("spawn")
+            self.proc = ctx.Process(target=ingest_main, name="pyrofex-ingest", daemon=True,
+                                    args=(self.name, self.capacity, self.port, self.authkey, os.getpid()))
+            self.proc.start()
+        atexit.register(self.close)
+        STATE.md = store
+        STATE.ingest = self
+        threading.Thread(target=self._watch, name="ingest-watch", daemon=True).start()
+        threading.Thread(target=self._sender, name="ingest-control", daemon=True).start()
+        return self
+
+    def send(self, *cmd: Any) -> None:
+        """Encola un comando de control (no bloquea: lo entrega un hilo con reintentos)."""
+        self._out.put(cmd)
+
+    def _sender(self) -> None:
+        while not self._stop.is_set():
+            try: cmd = self._out.get(timeout=0.5)
+            except queue.Empty: continue
+            for i in range(40):  # ~20 s: el hijo puede estar arrancando
+                try:
+                    with Client(("127.0.0.1", self.port), authkey=self.authkey) as c:
+                        c.send_bytes(_encode(cmd))
+                    break
+                except Exception:
+                    if self._stop.wait(0.5): return
+            else:
+                print(f"[ingest] no se pudo enviar {cmd[0]!r}")
+
+    def alive(self) -> bool:
+        """El proceso de ingest sigue vivo (el dueño mira su Process, el resto el pid del header)."""
+        if self.proc is not None: return self.proc.exitcode is None
+        return int(self.store.hdr[H_PID]) <= 0 or ingest_alive(self.store)  # 0: todavía arrancando
+
+    def _watch(self) -> None:
+        last = -1
+        hdr = self.store.hdr
+        dead = False
+        while not self._stop.is_set():
+            if not self.alive():
+                if not dead:
+                    dead = True
+                    code = self.proc.exitcode if self.proc is not None else "?"
+                    print(f"[ingest] el proceso de ingest murió (exitcode={code})")
+                STATE.connected = False  # el header queda con el último estado que escribió
+                self._stop.wait(self.poll)
+                continue
+            STATE.connected = bool(hdr[H_CONNECTED])
+            STATE.md_count = int(hdr[H_MDCOUNT])
+            seq = int(hdr[H_SEQ])
+            if seq != last:
+                last = seq
+                notify_data()
+            self._stop.wait(self.poll)
+
+    def received(self) -> int:
+        return int(self.store.hdr[H_RECEIVED]) if self.store is not None else 0
+
+    def queue_depth(self) -> int:
+        return int(self.store.hdr[H_DEPTH]) if self.store is not None else 0
+
+    def close(self) -> None:
+        """Sólo el dueño para al hijo y, ya terminado, borra el segmento; el resto lo suelta."""
+        self._stop.set()
+        if self.store is None: return
+        if self.proc is not None:
+            try:
+                with Client(("127.0.0.1", self.port), authkey=self.authkey) as c:
+                    c.send_bytes(_encode(("stop",)))
+            except Exception:
+                pass
+            self.proc.join(2.0)
+            if self.proc.is_alive():
+                self.proc.terminate()
+                self.proc.join()
+            self.proc = None
+            self.store.close(unlink=True)
+        else:
+            self.store.close()
+        self.store = None
+
+def start_ingest() -> IngestClient:
+    return STATE.ingest if STATE.ingest is not None else IngestClient().start()
@@ -0,0 +1,148 @@
+import json
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from config import VTO_MAP, INSTRUMENTS_CACHE
+from persist import write_atomic
+
+EQUITIES = ("GGAL", "YPFD", "PAMP", "ALUA", "CEPU")
+BONDS    = ("AL30", "AL30D")
+OPTION_PREFIXES = {"GFGC": "GGAL", "GFGV": "GGAL"}
+
+class InstrumentInfo(NamedTuple):
+    symbol: str
+    market: str                # "MERV" ("" si el símbolo no tiene el formato largo)
+    ticker: str                # "S30S5", "GFGC65025G", ...
+    settlement: str            # "24hs", "CI", ...
+    clean: str                 # como utils.clean_symbol: "S30S5 - 24hs"
+    kind: str                  # letra | option | bond | equity | other
+    underlying: Optional[str]  # opciones: "GGAL"
+    strike: Optional[float]    # opciones
+    is_call: bool
+    is_put: bool
+    expiry: Optional[date]     # letras (VTO_MAP) o maturity del broker
+    expiry_code: str           # opciones: sufijo de vencimiento ("G", "OC", ...)
+
+def _parse_date(s: Optional[str]) -> Optional[date]:
+    if not s: return None
+    for fmt in ("%Y-%m-%d", "%Y%m%d"):
+        try: return datetime.strptime(s, fmt).date()
+        except Exception: pass
+    return None
+
+def classify(symbol: str, maturity: Optional[str] = None) -> InstrumentInfo:
+    """Parsea un símbolo una sola vez con las mismas reglas que usaban ggal/letras/utils."""
+    parts = [p.strip() for p in symbol.split("-")]
+    if len(parts) >= 4 and parts[0] == "MERV" and parts[1] == "XMEV":
+        market, ticker, settlement = parts[0], parts[2], parts[3]
+        clean = f"{ticker} - {settlement}"
+    else:
+        market, ticker, settlement, clean = "", parts[0] if parts else symbol, "", symbol
+    # mismas reglas que ggal.is_call_code / is_put_code (sobre el 3er campo o el código entero)
+    fields = symbol.split("-")
+    if " - " in symbol and len(fields) < 3:
+        # forma corta "TICKER - plazo": mismo tipo que la larga (letras incluidas), pero
+        # sin código de opción que parsear (call/put/strike quedan vacíos)
+        part = ""
+    else:
+        part = fields[2].strip() if " - " in symbol else symbol
+    up = part.upper()
+    is_put = "V" in up
+    is_call = "C" in up and not is_put
+
+    if " - " in clean: ticker = clean.split(" - ")[0].strip()
+    left = ticker.upper() if " - " in clean else ""
+    underlying = strike = None
+    expiry_code = ""
+    prefix = next((p for p in OPTION_PREFIXES if p in left), None)
+    if " - " not in clean:
+        kind = "other"
+    elif prefix is not None:
+        kind = "option"
+        underlying = OPTION_PREFIXES[prefix]
+        digits = "".join(ch for ch in part if ch.isdigit())
+        strike = int(digits) / 10.0 if digits else None
+        expiry_code = part.upper()[len(prefix):].lstrip("0123456789")
+    elif left in EQUITIES:
+        kind = "equity"
+    elif left in BONDS:
+        kind = "bond"
+    else:
+        kind = "letra"
+    expiry = _parse_date(VTO_MAP.get(ticker)) or _parse_date(maturity)
+    return InstrumentInfo(symbol, market, ticker, settlement, clean, kind, underlying, strike,
+                          is_call, is_put, expiry, expiry_code)
+
+class InstrumentRegistry:
+    """Metadata de símbolos parseada una vez (al suscribir o al verlos por primera vez)
+    con índices por tipo y subyacente."""
+    def __init__(self):
+        self._by_sym: Dict[str, InstrumentInfo] = {}
+        self._by_kind: Dict[str, List[str]] = defaultdict(list)
+        self._maturity: Dict[str, str] = {}
+        self.version = 0
+
+    def get(self, symbol: str) -> InstrumentInfo:
+        info = self._by_sym.get(symbol)
+        if info is None:
+            info = classify(symbol, self._maturity.get(symbol))
+            self._by_sym[symbol] = info
+            self._by_kind[info.kind].append(symbol)
+            self.version += 1
+        return info
+
+    def register(self, symbols: Iterable[str]) -> None:
+        for s in symbols: self.get(s)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._by_sym
+
+    def of_kind(self, kind: str) -> List[str]:
+        return list(self._by_kind.get(kind, ()))
+
+    def options(self, underlying: str = "GGAL", calls: Optional[bool] = None) -> List[str]:
+        """Opciones del subyacente ordenadas por símbolo (calls=True/False filtra el lado)."""
+        out = []
+        for s in self._by_kind.get("option", ()):
+            info = self._by_sym[s]
+            if info.underlying != underlying: continue
+            if calls is True and not info.is_call: continue
+            if calls is False and not info.is_put: continue
+            out.append(s)
+        return sorted(out)
+
+    # --- semilla desde el broker + cache en disco ---
+    def seed_from_pyrofex(self) -> int:
+        """Registra el listado de instrumentos del broker y lo guarda en disco."""
+        import pyRofex
+        resp = pyRofex.get_detailed_instruments()
+        n = 0
+        for inst in (resp or {}).get("instruments", []) or []:
+            sym = (inst.get("instrumentId") or {}).get("symbol")
+            if not sym: continue
+            if inst.get("maturityDate"): self._maturity[sym] = str(inst["maturityDate"])
+            self.get(sym); n += 1
+        self.save_cache()
+        return n
+
+    def save_cache(self) -> None:
+        try:
+            data = {s: self._maturity.get(s) for s in self._by_sym}
+            write_atomic(INSTRUMENTS_CACHE, json.dumps(data, ensure_ascii=False))
+        except Exception:
+            pass
+
+    def load_cache(self) -> int:
+        try:
+            if not INSTRUMENTS_CACHE.exists(): return 0
+            data = json.loads(INSTRUMENTS_CACHE.read_text(encoding="utf-8"))
+        except Exception:
+            return 0
+        for s, mat in data.items():
+            if mat: self._maturity[s] = mat
+            self.get(s)
+        return len(data)
+
+REGISTRY = InstrumentRegistry()
+REGISTRY.load_cache()
@@ -0,0 +1,158 @@
+import atexit
+import bisect
+import json
+import queue
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple
+
+from config import TICK_JOURNAL_DIR
+
+# Archivo .bin: bloques [header][payload zlib]; payload = registros [ts, len][json].
+# Archivo .idx: una entrada (t_first, offset) por bloque -> índice temporal ralo.
+BLOCK_MAGIC = b"TJB1"
+BLOCK_HDR   = struct.Struct("<4sIddI")  # magic, n registros, t_first, t_last, len payload
+REC_HDR     = struct.Struct("<dI")      # ts de recepción, len json
+IDX_REC     = struct.Struct("<dQ")      # t_first, offset del bloque
+
+def segment_paths(directory: Path, day: str) -> Tuple[Path, Path]:
+    return directory / f"ticks-{day}.bin", directory / f"ticks-{day}.idx"
+
+class TickJournal:
+    """Grabador append-only de mensajes crudos de market data, un segmento por día.
+
+    `record()` sólo encola (nunca toca disco); un thread de fondo serializa,
+    arma bloques comprimidos de hasta `block_records` mensajes o `flush_seconds`
+    y los agrega al segmento del día junto con su entrada de índice.
+    """
+    def __init__(self, directory: Path, block_records: int = 512, flush_seconds: float = 1.0,
+                 max_pending: int = 200_000, level: int = 6):
+        self.directory = Path(directory)
+        self.block_records = block_records
+        self.flush_seconds = flush_seconds
+        self.level = level
+        self._q: "queue.Queue[Optional[Tuple[float, Any]]]" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self.recorded = 0
+        self.dropped = 0
+        self.blocks = 0
+
+    def start(self) -> "TickJournal":
+        if self._thread is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="tick-journal", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def record(self, message: Any, ts: Optional[float] = None) -> None:
+        try:
+            self._q.put_nowait((time.time() if ts is None else ts, message))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._thread is None: return
+        self._q.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        buf: List[bytes] = []
+        t_first = t_last = 0.0
+        day = ""
+        deadline = time.monotonic() + self.flush_seconds
+        while True:
+            try:
+                item = self._q.get(timeout=max(deadline - time.monotonic(), 0.01))
+            except queue.Empty:
+                item = ()
+            stop = item is None
+            if item:
+                ts, msg = item
+                d = datetime.fromtimestamp(ts).strftime("%Y%m%d")
+                if buf and d != day:
+                    self._write_block(day, buf, t_first, t_last); buf = []
+                if not buf:
+                    day, t_first = d, ts
+                body = json.dumps(msg, separators=(",", ":"), default=str).encode("utf-8")
+                buf.append(REC_HDR.pack(ts, len(body)) + body)
+                t_last = ts
+            if buf and (stop or len(buf) >= self.block_records or time.monotonic() >= deadline):
+                self._write_block(day, buf, t_first, t_last); buf = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_seconds
+            if stop:
+                return
+
+    def _write_block(self, day: str, recs: List[bytes], t_first: float, t_last: float) -> None:
+        payload = zlib.compress(b"".join(recs), self.level)
+        bin_path, idx_path = segment_paths(self.directory, day)
+        try:
+            with open(bin_path, "ab") as f:
+                offset = f.tell()
+                f.write(BLOCK_HDR.pack(BLOCK_MAGIC, len(recs), t_first, t_last, len(payload)))
+                f.write(payload)
+            with open(idx_path, "ab") as f:
+                f.write(IDX_REC.pack(t_first, offset))
+            self.recorded += len(recs)
+            self.blocks += 1
+        except Exception as e:
+            print(f"[journal] error escribiendo {bin_path}: {e}")
+
+def _load_index(bin_path: Path) -> List[Tuple[float, int]]:
+    """Índice (t_first, offset); si falta el .idx se reconstruye leyendo headers."""
+    idx_path = bin_path.with_suffix(".idx")
+    if idx_path.exists():
+        raw = idx_path.read_bytes()
+        n = len(raw) // IDX_REC.size
+        return [IDX_REC.unpack_from(raw, i*IDX_REC.size) for i in range(n)]
+    out = []
+    with open(bin_path, "rb") as f:
+        while True:
+            off = f.tell()
+            hdr = f.read(BLOCK_HDR.size)
+            if len(hdr) < BLOCK_HDR.size: break
+            magic, _n, t0, _t1, ln = BLOCK_HDR.unpack(hdr)
+            if magic != BLOCK_MAGIC: break
+            out.append((t0, off))
+            f.seek(ln, 1)
+    return out
+
+def read_journal(bin_path: Path, start: Optional[float] = None,
+                 end: Optional[float] = None) -> Iterator[Tuple[float, Any]]:
+    """Itera (ts, mensaje) de un segmento, opcionalmente acotado a [start, end]."""
+    bin_path = Path(bin_path)
+    index = _load_index(bin_path)
+    pos = 0
+    if start is not None and index:
+        pos = max(bisect.bisect_right([t for t, _ in index], start) - 1, 0)
+    if pos >= len(index): return
+    with open(bin_path, "rb") as f:
+        f.seek(index[pos][1])
+        while True:
+            hdr = f.read(BLOCK_HDR.size)
+            if len(hdr) < BLOCK_HDR.size: return
+            magic, n, t0, t1, ln = BLOCK_HDR.unpack(hdr)
+            if magic != BLOCK_MAGIC: return
+            if end is not None and t0 > end: return
+            data = f.read(ln)
+            if len(data) < ln: return  # bloque truncado (crash a mitad de escritura)
+            if start is not None and t1 < start: continue
+            raw = zlib.decompress(data)
+            off = 0
+            for _ in range(n):
+                ts, size = REC_HDR.unpack_from(raw, off); off += REC_HDR.size
+                body = raw[off:off+size]; off += size
+                if start is not None and ts < start: continue
+                if end is not None and ts > end: return
+                yield ts, json.loads(body)
+
+def list_segments(directory: Path) -> List[Path]:
+    return sorted(Path(directory).glob("ticks-*.bin"))
+
+JOURNAL: Optional[TickJournal] = TickJournal(Path(TICK_JOURNAL_DIR)).start() if TICK_JOURNAL_DIR else None
@@ -1,121 +1,139 @@
-import time
 import numpy as np
 import pandas as pd
-from datetime import date, datetime
-from typing import Any, Dict, Optional
+from datetime import date
+from typing import Dict, NamedTuple, Optional, Tuple
 from bokeh.models import ColumnDataSource, HoverTool, LabelSet, Range1d
 from bokeh.plotting import figure
 import panel as pn
 
 from state import STATE
-from utils import to_float, fmt_thousand, clean_symbol
-from config import VTO_MAP, FINISH_MAP
+from config import FINISH_MAP, BOOK_QTY
+from instruments import REGISTRY, InstrumentInfo
 from ggal import get_mep_last_and_var
 
+class _Static(NamedTuple):
+    """Datos fijos de un set de letras, alineados con `syms`."""
+    syms: Tuple[str, ...]
+    infos: Tuple[InstrumentInfo, ...]
+    finish: np.ndarray      # FINISH_MAP (NaN si no hay)
+    vto_ord: np.ndarray     # date.toordinal() del vencimiento (NaN si no hay)
+    banda: np.ndarray       # techo de la banda BCRA al mes del vencimiento (NaN si no hay)
+    vto_txt: Tuple[str, ...]
+
+_STATIC: Optional[_Static] = None
+_DIAS: Tuple[Optional[tuple], np.ndarray] = (None, np.empty(0))
+
+def _banda_sup(vto: date) -> float:
+    n_meses = (vto.year - 2025) * 12 + (vto.month - 4)
+    if n_meses < 0: n_meses = 0
+    return 1400.0 * (1.0 + 0.01 * n_meses)
+
+def _static_table(syms: Tuple[str, ...]) -> _Static:
+    """Se arma una vez por set de letras suscriptas (no por tick)."""
+    global _STATIC
+    if _STATIC is not None and _STATIC.syms == syms:
+        return _STATIC
+    infos = tuple(REGISTRY.get(s) for s in syms)
+    finish = [FINISH_MAP.get(i.ticker) for i in infos]
+    vtos = [i.expiry for i in infos]
+    banda = [_banda_sup(v) if v is not None else None for v in vtos]
+    nan = lambda v: np.nan if v is None else float(v)
+    _STATIC = _Static(
+        syms, infos,
+        np.array([nan(f) for f in finish], dtype=float),
+        np.array([nan(v.toordinal() if v else None) for v in vtos], dtype=float),
+        np.array([nan(b) for b in banda], dtype=float),
+        tuple("" if not v else v.strftime("%d/%m/%Y") for v in vtos),
+    )
+    return _STATIC
+
+def _dias(st: _Static, today: date) -> np.ndarray:
+    """Días al vencimiento (NaN sin VTO); se recalcula sólo si cambia la fecha o el set."""
+    global _DIAS
+    key = (st.syms, today)
+    if _DIAS[0] != key:
+        _DIAS = (key, np.maximum(st.vto_ord - today.toordinal() - 1, 0))
+    return _DIAS[1]
+
+def _tea(ratio: float, expo: float) -> float:
+    try:
+        return ((ratio ** expo) - 1.0) * 100.0
+    except OverflowError:
+        return np.nan
+
+def compute_letras(syms: Tuple[str, ...], today: date, mep_last: Optional[float]) -> Dict[str, np.ndarray]:
+    """Métricas numéricas de todas las letras a la vez (NaN donde la fila no tiene dato)."""
+    st = _static_table(syms)
+    md = STATE.md.take(syms, ("LAST", "BID", "ASK", "CLOSE", "TS", "BID_SIZE", "ASK_SIZE"))
+    last, close = md["LAST"], md["CLOSE"]
+    dias = _dias(st, today)
+    out = dict(md, DIAS=dias, FINISH=st.finish, BANDA=st.banda)
+    with np.errstate(all="ignore"):
+        has_close = ~np.isnan(close) & (close != 0)
+        var_abs = np.where(~np.isnan(last) & has_close, last - close, np.nan)
+        out["VAR"] = var_abs
+        out["VAR_PCT"] = var_abs / close * 100.0
+
+        ok = np.isfinite(st.finish) & (st.finish != 0) & (last > 0) & (dias > 0)  # last/dias NaN: False
+        ratio = np.where(ok, st.finish / last, np.nan)
+        tna = ((ratio - 1.0) * 365.0 / dias) * 100.0
+        # la potencia va con el pow() de Python: np.power puede diferir en el último ulp
+        tea = np.full(len(syms), np.nan)
+        idx = np.flatnonzero(ok)
+        tea[idx] = [_tea(x, e) for x, e in zip(ratio[idx].tolist(), (365.0 / dias[idx]).tolist())]
+        out["POR_GANAR"] = (ratio - 1.0) * 100.0
+        out["TNA"] = tna
+        out["TEA"] = tea
+
+        mep_mul = (mep_last * (1.0 + (tna/100.0/365.0) * dias) if mep_last is not None
+                   else np.full(len(syms), np.nan))
+        out["MEP"] = mep_mul
+        out["PCT_SOBRE_BANDA"] = ((mep_mul - st.banda) / st.banda) * 100.0
+    book = STATE.book
+    out["BOOK_BID"] = book.depth_qty(syms, "BI")
+    out["BOOK_ASK"] = book.depth_qty(syms, "OF")
+    out["VWAP_BID"] = book.vwap(syms, "BI", BOOK_QTY)
+    out["VWAP_ASK"] = book.vwap(syms, "OF", BOOK_QTY)
+    return out
+
+LETRAS_COLS = ["Instrumento","Vol.C","Compra","Venta","Vol.V","Últ","Var","Var %",
+               "Por Ganar","TNA","TEA","VTO","DIAS","FINISH","MEP","Banda Sup","% sobre banda","Último cambio"]
+# libro (opcionales: la UI las saca si no están activadas)
+LETRAS_BOOK_COLS = ["Prof. C","VWAP C","VWAP V","Prof. V"]
+
+_LAST_NUM: Tuple[Tuple[str, ...], Dict[str, np.ndarray]] = ((), {})
+
+def letras_chart_points() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(DIAS, TEA, letra) numéricos del último build_letras_df, sin TY30P."""
+    syms, num = _LAST_NUM
+    if not syms:
+        return np.empty(0), np.empty(0), np.empty(0, dtype=object)
+    label = np.array([REGISTRY.get(s).clean.split(" - ")[0].strip() for s in syms], dtype=object)
+    keep = np.array([l.upper() != "TY30P" for l in label], dtype=bool)
+    return num["DIAS"][keep], num["TEA"][keep], label[keep]
+
 def build_letras_df() -> pd.DataFrame:
+    """Tabla numérica (NaN = sin dato); el formato lo aplica Tabulator en el browser."""
     today = date.today()
     mep_last, _ = get_mep_last_and_var()
-    rows = []
-    for sym in STATE.subscribed_order:
-        inst_clean = clean_symbol(sym)
-        if " - " not in inst_clean:
-            continue
-        left = inst_clean.split(" - ")[0].strip()
-        if left.upper() in ("GGAL","YPFD","PAMP","ALUA","CEPU","AL30","AL30D"):
-            continue
-        if ("GFGC" in left.upper()) or ("GFGV" in left.upper()):
-            continue
-
-        rec: Dict[str, Any] = STATE.md.get(sym, {})
-        last  = to_float(rec.get("LAST"))
-        bid   = to_float(rec.get("BID")); bid_sz = rec.get("BID_SIZE")
-        ask   = to_float(rec.get("ASK")); ask_sz = rec.get("ASK_SIZE")
-        close = to_float(rec.get("CLOSE"))
-        ts    = rec.get("TS")
-
-        var_abs = (last - close) if (last is not None and close not in (None, 0)) else None
-        var_pct = (var_abs / close * 100.0) if (var_abs is not None and close) else None
-
-        finish = FINISH_MAP.get(left)
-        vto_str = VTO_MAP.get(left)
-        vto = None
-        if vto_str:
-            try:
-                vto = datetime.strptime(vto_str, "%Y-%m-%d").date()
-            except Exception:
-                vto = None
-
-        dias = (vto - today).days - 1 if vto else None
-        if dias is not None and dias < 0:
-            dias = 0
-
-        por_ganar = tna = tea = None
-        if finish and last and dias and dias > 0 and last > 0:
-            try:
-                ratio = finish / last
-                por_ganar = (ratio - 1.0) * 100.0
-                tna = ((ratio - 1.0) * 365.0 / dias) * 100.0
-                tea = ((ratio ** (365.0 / dias)) - 1.0) * 100.0
-            except Exception:
-                pass
-
-        mep_mul = None
-        if (mep_last is not None) and (tna is not None) and (dias is not None):
-            try:
-                mep_mul = mep_last * (1.0 + (tna/100.0/365.0) * dias)
-            except Exception:
-                mep_mul = None
-
-        banda_sup = None
-        pct_sobre = None
-        try:
-            if vto is not None:
-                n_meses = (vto.year - 2025) * 12 + (vto.month - 4)
-                if n_meses < 0: n_meses = 0
-                banda_sup_val = 1400.0 * (1.0 + 0.01 * n_meses)
-                banda_sup = banda_sup_val
-                if (mep_mul is not None) and (banda_sup_val != 0):
-                    pct_sobre = ((mep_mul - banda_sup_val) / banda_sup_val) * 100.0
-        except Exception:
-            banda_sup = None
-            pct_sobre = None
-
-        def var_html(v: Optional[float]):
-            if v is None:
-                return ""
-            s = f"{v:+.2f}".replace(".", ",")
-            if v > 0:
-                bg = "rgba(46,204,113,.22)"
-            elif v < 0:
-                bg = "rgba(231,76,60,.22)"
-            else:
-                bg = "transparent"
-            return f"<span class='iv-cell' style='background:{bg}'>{s}</span>"
-
-        rows.append({
-            "Instrumento": inst_clean,
-            "Vol.C": "" if bid_sz is None else f"{int(bid_sz):,}".replace(",", "."),
-            "Compra": "" if bid   is None else fmt_thousand(bid, 3),
-            "Venta":  "" if ask   is None else fmt_thousand(ask, 3),
-            "Vol.V": "" if ask_sz is None else f"{int(ask_sz):,}".replace(",", "."),
-            "Últ":    "" if last  is None else fmt_thousand(last, 3),
-            "Var":    var_html(var_abs),
-            "Var %":  var_html(var_pct),
-            "Por Ganar": "" if por_ganar is None else f"{por_ganar:.2f}".replace(".", ","),
-            "TNA":       "" if tna       is None else f"{tna:.2f}".replace(".", ","),
-            "TEA":       "" if tea       is None else f"{tea:.2f}".replace(".", ","),
-            "VTO": "" if not vto else vto.strftime("%d/%m/%Y"),
-            "DIAS": "" if dias is None else int(dias),
-            "FINISH": "" if finish is None else fmt_thousand(finish, 2),
-            "MEP": "" if mep_mul is None else fmt_thousand(mep_mul, 2),
-            "Banda Sup": "" if banda_sup is None else fmt_thousand(banda_sup, 2),
-            "% sobre banda": "" if pct_sobre is None else f"{pct_sobre:+.2f}".replace(".", ","),
-            "Último cambio": "" if not ts else time.strftime("%H:%M:%S", time.localtime(ts)),
-        })
-
-    cols = ["Instrumento","Vol.C","Compra","Venta","Vol.V","Últ","Var","Var %",
-            "Por Ganar","TNA","TEA","VTO","DIAS","FINISH","MEP","Banda Sup","% sobre banda","Último cambio"]
-    return pd.DataFrame(rows, columns=cols)
+    syms = tuple(s for s in STATE.subscribed_order if REGISTRY.get(s).kind == "letra")
+    global _LAST_NUM
+    if not syms:
+        _LAST_NUM = ((), {})
+        return pd.DataFrame(columns=LETRAS_COLS + LETRAS_BOOK_COLS)
+    num = compute_letras(syms, today, mep_last)
+    _LAST_NUM = (syms, num)
+    st = _STATIC
+    return pd.DataFrame({
+        "Instrumento": [i.clean for i in st.infos],
+        "Vol.C": num["BID_SIZE"], "Compra": num["BID"], "Venta": num["ASK"], "Vol.V": num["ASK_SIZE"],
+        "Últ": num["LAST"], "Var": num["VAR"], "Var %": num["VAR_PCT"],
+        "Por Ganar": num["POR_GANAR"], "TNA": num["TNA"], "TEA": num["TEA"],
+        "VTO": st.vto_txt, "DIAS": num["DIAS"], "FINISH": st.finish, "MEP": num["MEP"],
+        "Banda Sup": st.banda, "% sobre banda": num["PCT_SOBRE_BANDA"], "Último cambio": num["TS"],
+        "Prof. C": num["BOOK_BID"], "VWAP C": num["VWAP_BID"],
+        "VWAP V": num["VWAP_ASK"], "Prof. V": num["BOOK_ASK"],
+    }, columns=LETRAS_COLS + LETRAS_BOOK_COLS)
 
 class LetrasChart:
     def __init__(self):
@@ -125,6 +143,11 @@ class LetrasChart:
                    toolbar_location=None)
         p.y_range = Range1d(start=0, end=1)
         p.circle("x","y", size=7, source=self.src, line_alpha=0, fill_alpha=0.9)
+        # una sola línea de tendencia; se actualiza su source, no se recrea el glyph
+        self.trend_src = ColumnDataSource(dict(x=[], y=[]))
+        p.line("x", "y", source=self.trend_src, line_color="orange", line_width=2, alpha=0.8,
+               legend_label="Tendencia", name="trend")
+        self._key: Optional[tuple] = None
         labels = LabelSet(
             x='x', y='y_label', text='label', source=self.src,
             text_font_size='7pt', text_color="#e6e6e6",
@@ -145,41 +168,24 @@ class LetrasChart:
         self.fig = p
         self.pane = pn.pane.Bokeh(self.fig)
 
-    def update(self, df: pd.DataFrame):
-        if df is None or df.empty:
-            self.src.data = dict(x=[], y=[], y_label=[], label=[])
-            return
-
-        data = df.copy()
-        data["LETRA"] = data["Instrumento"].str.split(" - ").str[0].str.strip()
-        data = data[(data["TEA"].astype(str) != "") & (data["DIAS"].astype(str) != "")]
-        data = data[data["LETRA"].str.upper() != "TY30P"]
-        if data.empty:
-            self.src.data = dict(x=[], y=[], y_label=[], label=[])
-            return
-
-        def to_num(v):
-            try:
-                return float(str(v).replace(",", "."))
-            except Exception:
-                return np.nan
-
-        x = data["DIAS"].apply(to_num).values.astype(float)
-        y = data["TEA"].apply(to_num).values.astype(float)
-        label = data["LETRA"].fillna("").astype(str).values
-
+    def update(self, x: np.ndarray, y: np.ndarray, label: np.ndarray):
+        """Puntos (DIAS, TEA, letra) numéricos; no hace nada si no cambiaron."""
+        x = np.asarray(x, dtype=float); y = np.asarray(y, dtype=float)
+        label = np.asarray(label, dtype=object)
         mask = np.isfinite(x) & np.isfinite(y)
         x, y, label = x[mask], y[mask], label[mask]
+        key = (x.tobytes(), y.tobytes(), tuple(label))
+        if key == self._key:
+            return
+        self._key = key
 
         if len(y):
             y_min = float(np.min(y)); y_max = float(np.max(y))
-            if not np.isfinite(y_min) or not np.isfinite(y_max):
-                y_min, y_max = 0.0, 1.0
             if y_max - y_min < 1e-9:
                 y_min -= 1.0; y_max += 1.0
             pad = 10.0
-            self.fig.y_range.start = y_min - pad
-            self.fig.y_range.end   = y_max + pad
+            if self.fig.y_range.start != y_min - pad: self.fig.y_range.start = y_min - pad
+            if self.fig.y_range.end   != y_max + pad: self.fig.y_range.end   = y_max + pad
 
         if len(x):
             order = np.argsort(x)
@@ -190,14 +196,12 @@ class LetrasChart:
         else:
             y_label = y
 
-        self.fig.renderers = [r for r in self.fig.renderers if getattr(r, "name", "") != "trend"]
         if len(x) > 2:
             coef = np.polyfit(x, y, deg=2)
-            poly = np.poly1d(coef)
             x_fit = np.linspace(float(np.min(x)), float(np.max(x)), 200)
-            y_fit = poly(x_fit)
-            self.fig.line(x_fit, y_fit, line_color="orange", line_width=2, alpha=0.8,
-                          legend_label="Tendencia", name="trend")
+            self.trend_src.data = dict(x=x_fit, y=np.poly1d(coef)(x_fit))
+        elif len(self.trend_src.data["x"]):
+            self.trend_src.data = dict(x=[], y=[])
 
         self.src.data = dict(x=x, y=y, y_label=y_label, label=label)
 
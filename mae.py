@@ -1,27 +1,84 @@
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional, Tuple
 from config import MAE_FOR_URL
 
-_MAE_CACHE = {"ts": 0.0, "price": None, "var": None}
+class MaeRefresher:
+    """Cotización USD mayorista de MAE refrescada en un thread de fondo.
 
-def get_usd_may_from_mae(cache_seconds: int = 30) -> Tuple[Optional[float], Optional[float]]:
-    now = time.time()
-    if (now - _MAE_CACHE["ts"]) < cache_seconds:
-        return _MAE_CACHE["price"], _MAE_CACHE["var"]
-    try:
-        r = requests.get(MAE_FOR_URL, timeout=4)
+    Los lectores sólo leen el último valor (stale-while-revalidate); ante errores
+    se reintenta con backoff exponencial y se sigue sirviendo el dato viejo.
+    """
+    def __init__(self, url: str = MAE_FOR_URL, ttl: float = 30.0, timeout: float = 4.0,
+                 backoff_base: float = 2.0, backoff_max: float = 300.0):
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.price: Optional[float] = None
+        self.var: Optional[float] = None
+        self.ts = 0.0       # último fetch exitoso
+        self.errors = 0     # errores consecutivos
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive(): return
+            self._thread = threading.Thread(target=self._run, name="mae-refresher", daemon=True)
+            self._thread.start()
+
+    def refresh_now(self) -> None:
+        self._wake.set()
+
+    def snapshot(self) -> Tuple[Optional[float], Optional[float]]:
+        with self._lock:
+            return self.price, self.var
+
+    def age(self) -> Optional[float]:
+        """Segundos desde el último dato bueno (None si nunca hubo)."""
+        return None if not self.ts else time.time() - self.ts
+
+    def _fetch(self) -> None:
+        r = self.session.get(self.url, timeout=self.timeout)
         r.raise_for_status()
         data = r.json()
-        if isinstance(data, list) and len(data) > 0:
-            row = data[0]
-            def _to_float(x):
-                try: return float(x)
-                except Exception: return None
-            price = _to_float(row.get("ultimo"))
-            var   = _to_float(row.get("variacion"))
-            _MAE_CACHE.update(ts=now, price=price, var=var)
-            return price, var
-    except Exception:
-        return _MAE_CACHE["price"], _MAE_CACHE["var"]
-    return None, None
+        if not (isinstance(data, list) and len(data) > 0):
+            raise ValueError("respuesta MAE vacía")
+        row = data[0]
+        def _to_float(x):
+            try: return float(x)
+            except Exception: return None
+        with self._lock:
+            self.price = _to_float(row.get("ultimo"))
+            self.var   = _to_float(row.get("variacion"))
+            self.ts = time.time()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._fetch()
+                self.errors = 0
+                delay = self.ttl
+            except Exception:
+                self.errors += 1
+                delay = min(self.backoff_base * (2 ** (self.errors - 1)), self.backoff_max)
+            self._wake.wait(delay)
+            self._wake.clear()
+
+MAE = MaeRefresher()
+
+def get_usd_may_from_mae(cache_seconds: int = 30) -> Tuple[Optional[float], Optional[float]]:
+    """Último valor conocido; nunca bloquea en la red (el fetch corre en MAE)."""
+    MAE.ttl = cache_seconds
+    MAE.start()
+    return MAE.snapshot()
+
+def get_usd_may_age() -> Optional[float]:
+    return MAE.age()
@@ -0,0 +1,72 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+class CoalescingBuffer:
+    """Buffer de ingest latest-wins: a lo sumo un mensaje pendiente por símbolo.
+
+    Los marketData del mismo símbolo se fusionan en el lugar (BI/OF/LA/CL: gana
+    el último que vino, igual que aplicarlos en orden; una lista vacía es un lado
+    del libro que se vació y también pisa). El resto de los mensajes
+    (errores, order reports) va a una cola acotada que descarta los más viejos.
+    Los snapshots REST del warm-up van aparte y sin tope (son uno por símbolo
+    pedido): no pueden perderse por una ráfaga de errores.
+    """
+    def __init__(self, max_other: int = 1000):
+        self._lock = threading.Lock()
+        self._md: Dict[str, Dict[str, Any]] = {}
+        self._other: Deque[Dict[str, Any]] = deque(maxlen=max_other)
+        self._snap: List[Dict[str, Any]] = []
+        self.received = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def put_nowait(self, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self.received += 1
+            if payload.get("type") != "marketData":
+                if len(self._other) == self._other.maxlen:
+                    self.dropped += 1
+                self._other.append(payload)
+                return
+            data = payload.get("data") or {}
+            sym = (data.get("instrumentId") or {}).get("symbol")
+            if not sym:
+                self.dropped += 1
+                return
+            md = data.get("marketData") or {}
+            cur = self._md.get(sym)
+            if cur is None:
+                self._md[sym] = {"type": "marketData",
+                                 "data": {"instrumentId": data["instrumentId"],
+                                          "marketData": {k: v for k, v in md.items() if v is not None}}}
+                return
+            merged = cur["data"]["marketData"]
+            for k, v in md.items():
+                if v is not None: merged[k] = v
+            self.coalesced += 1
+
+    def put_snapshot(self, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self.received += 1
+            self._snap.append(payload)
+
+    def drain(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Saca los pendientes: primero los mensajes no-md, después los snapshots
+        (así el tick en vivo del mismo drain queda por encima) y uno por símbolo."""
+        with self._lock:
+            out: List[Dict[str, Any]] = list(self._other)
+            self._other.clear()
+            out.extend(self._snap)
+            self._snap = []
+            if limit is None or len(self._md) <= limit:
+                out.extend(self._md.values())
+                self._md = {}
+            else:
+                for sym in list(self._md)[:limit]:
+                    out.append(self._md.pop(sym))
+            return out
+
+    def qsize(self) -> int:
+        with self._lock:
+            return len(self._md) + len(self._other) + len(self._snap)
@@ -0,0 +1,220 @@
+import os
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+import numpy as np
+
+from md_store import MarketDataStore, FLOAT_FIELDS, INT_FIELDS, NO_SIZE
+
+MAGIC     = 0x50524D44  # "PRMD"
+SYM_BYTES = 128
+# header int64: magic, capacidad, n símbolos, seq, conectado, md_count, recibidos, cola,
+# pid del ingest, pid del creador (el único que lanza el ingest y borra el segmento),
+# y desde H_KEY los KEY_BYTES de la clave del canal de control (el segmento es 0600)
+(H_MAGIC, H_CAP, H_NSYM, H_SEQ, H_CONNECTED, H_MDCOUNT, H_RECEIVED, H_DEPTH,
+ H_PID, H_OWNER, H_KEY) = range(11)
+KEY_BYTES = 32
+HDR_LEN = 16
+
+def _layout(capacity: int) -> Dict[str, int]:
+    """Offsets (bytes) de cada bloque dentro del segmento."""
+    off, out = HDR_LEN*8, {}
+    for f in FLOAT_FIELDS + INT_FIELDS + ("ver", "lock"):
+        out[f] = off; off += capacity*8
+    out["names"] = off; off += capacity*SYM_BYTES
+    out["size"] = off
+    return out
+
+class SharedMarketDataStore(MarketDataStore):
+    """El mismo top-of-book que MarketDataStore pero en shared memory, capacidad fija.
+
+    Un solo proceso escribe (el de ingest); los de UI leen las columnas como vistas
+    sin copiar. Cada fila tiene un contador seqlock (`lock`): impar mientras se escribe,
+    y las lecturas reintentan si cambió en el medio. La tabla de símbolos también vive
+    en el segmento: los lectores incorporan los nuevos al ver crecer el header.
+    """
+    def __init__(self, name: str, capacity: int = 4096, create: bool = False, key: bytes = b""):
+        lay = _layout(capacity)
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=lay["size"])
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            _untrack(self.shm)
+        buf = self.shm.buf
+        self.hdr = np.ndarray(HDR_LEN, dtype=np.int64, buffer=buf)
+        if create:
+            self.hdr[:] = 0
+            self.hdr[H_CAP] = capacity
+            self.hdr[H_OWNER] = os.getpid()
+            self.hdr[H_KEY:H_KEY + KEY_BYTES//8] = np.frombuffer(key[:KEY_BYTES].ljust(KEY_BYTES, b"\0"), dtype=np.int64)
+        elif self.hdr[H_MAGIC] != MAGIC or self.hdr[H_CAP] != capacity:
+            raise RuntimeError(f"segmento {name!r} con otro formato o capacidad")
+        self.capacity = capacity
+        self.cols = {}
+        for f in FLOAT_FIELDS:
+            self.cols[f] = np.ndarray(capacity, dtype=np.float64, buffer=buf, offset=lay[f])
+        for f in INT_FIELDS:
+            self.cols[f] = np.ndarray(capacity, dtype=np.int64, buffer=buf, offset=lay[f])
+        self.ver  = np.ndarray(capacity, dtype=np.int64, buffer=buf, offset=lay["ver"])
+        self.lock = np.ndarray(capacity, dtype=np.int64, buffer=buf, offset=lay["lock"])
+        self.names = np.ndarray(capacity, dtype=f"S{SYM_BYTES}", buffer=buf, offset=lay["names"])
+        if create:
+            for f in FLOAT_FIELDS: self.cols[f][:] = np.nan
+            for f in INT_FIELDS:   self.cols[f][:] = NO_SIZE
+            self.ver[:] = 0; self.lock[:] = 0
+            self.hdr[H_MAGIC] = MAGIC  # último: recién ahora el segmento es válido
+        self._index: Dict[str, int] = {}
+        self._syms: List[str] = []
+        self._sync_index()
+
+    @property
+    def key(self) -> bytes:
+        """Clave del canal de control que dejó el creador (b"" si no dejó ninguna)."""
+        return self.hdr[H_KEY:H_KEY + KEY_BYTES//8].tobytes().rstrip(b"\0")
+
+    @property
+    def seq(self) -> int:
+        return int(self.hdr[H_SEQ])
+
+    @seq.setter
+    def seq(self, v: int) -> None:
+        self.hdr[H_SEQ] = v
+
+    def close(self, unlink: bool = False) -> None:
+        for a in ("hdr", "cols", "ver", "lock", "names"):
+            setattr(self, a, None)
+        try: self.shm.close()
+        except BufferError: pass  # quedan vistas vivas; se libera al salir
+        if unlink:
+            _track(self.shm)  # el hijo spawn comparte tracker y pudo haberlo des-registrado
+            try: self.shm.unlink()
+            except FileNotFoundError: pass
+
+    # --- escritura (sólo el proceso de ingest) ---
+    def row_of(self, sym: str) -> int:
+        row = self._index.get(sym)
+        if row is None:
+            row = len(self._syms)
+            if row >= self.capacity:
+                raise RuntimeError(f"shared memory llena ({self.capacity} símbolos)")
+            self.names[row] = sym.encode("utf-8")[:SYM_BYTES]
+            self._index[sym] = row
+            self._syms.append(sym)
+            self.hdr[H_NSYM] = row + 1  # publica el símbolo después de escribir el nombre
+        return row
+
+    def _grow(self) -> None:
+        raise RuntimeError("el store compartido no crece")
+
+    def begin(self, row: int) -> None:
+        self.lock[row] += 1  # impar: fila en escritura (touch() la cierra siempre, aun con error)
+
+    def touch(self, row: int) -> None:
+        self.hdr[H_SEQ] += 1
+        self.ver[row] = self.hdr[H_SEQ]
+        self.lock[row] += 1  # par: fila consistente
+
+    # --- lectura ---
+    def _sync_index(self) -> None:
+        n = int(self.hdr[H_NSYM])
+        for i in range(len(self._syms), n):
+            sym = self.names[i].decode("utf-8")
+            self._index[sym] = i
+            self._syms.append(sym)
+
+    def rows(self, syms: Sequence[str]) -> np.ndarray:
+        self._sync_index()
+        return super().rows(syms)
+
+    def take(self, syms: Sequence[str], fields: Iterable[str] = FLOAT_FIELDS) -> Dict[str, np.ndarray]:
+        fields = tuple(fields)
+        idx = self.rows(syms)
+        safe = np.where(idx < 0, 0, idx)
+        before = self.lock[safe].copy()
+        out = super().take(syms, fields)
+        # filas que se escribieron durante la copia: se releen una por una con su seqlock
+        torn = np.flatnonzero((idx >= 0) & (((before & 1) == 1) | (before != self.lock[safe])))
+        for i in torn.tolist():
+            rec = self._record(int(idx[i]))
+            for f in fields:
+                v = rec[f]
+                out[f][i] = np.nan if v is None else v
+        return out
+
+    def _record(self, row: int) -> Dict[str, Any]:
+        deadline = None
+        while True:
+            before = int(self.lock[row])
+            if not before & 1:
+                rec = super()._record(row)
+                if before == int(self.lock[row]):
+                    return rec
+            # el escritor puede estar desalojado a mitad de la fila: se cede el CPU
+            if deadline is None:
+                deadline = time.monotonic() + 0.05
+            elif time.monotonic() > deadline:
+                return super()._record(row)
+            time.sleep(0)
+
+    def version(self, sym):
+        self._sync_index()
+        return super().version(sym)
+
+    def get(self, sym: str, default: Any = None) -> Any:
+        self._sync_index()
+        return super().get(sym, default)
+
+    def __getitem__(self, sym: str) -> Dict[str, Any]:
+        self._sync_index()
+        return super().__getitem__(sym)
+
+    def __contains__(self, sym: object) -> bool:
+        self._sync_index()
+        return super().__contains__(sym)
+
+    def __iter__(self) -> Iterator[str]:
+        self._sync_index()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        self._sync_index()
+        return super().__len__()
+
+    def keys(self) -> List[str]:
+        self._sync_index()
+        return super().keys()
+
+    def items(self) -> Iterator:
+        self._sync_index()
+        return super().items()
+
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    """En <3.13 el resource_tracker borra el segmento al salir cualquier proceso que lo
+    abrió; sólo el creador debe hacerlo."""
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0: return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+def _track(shm: shared_memory.SharedMemory) -> None:
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.register(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+def owner_alive(store: SharedMarketDataStore) -> bool:
+    """Vive el proceso que creó el segmento (y es dueño del ingest)."""
+    return _pid_alive(int(store.hdr[H_OWNER]))
+
+def ingest_alive(store: SharedMarketDataStore) -> bool:
+    return _pid_alive(int(store.hdr[H_PID]))
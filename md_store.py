@@ -0,0 +1,124 @@
+import numpy as np
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+FLOAT_FIELDS = ("LAST", "BID", "ASK", "CLOSE", "TS")
+INT_FIELDS   = ("BID_SIZE", "ASK_SIZE")
+FIELDS       = FLOAT_FIELDS + INT_FIELDS
+NO_SIZE      = -1  # centinela de "sin dato" en las columnas enteras
+
+class MarketDataStore:
+    """Top-of-book columnar: una fila por símbolo, columnas NumPy que crecen duplicando.
+
+    Para el código existente se comporta como el dict-de-dicts anterior
+    (`get`, `in`, `[]`, `keys`): cada lectura arma un dict con None donde no hay dato.
+    Los builders pueden leer columnas enteras con `take`.
+    """
+    def __init__(self, capacity: int = 64):
+        self._index: Dict[str, int] = {}
+        self._syms: List[str] = []
+        self.cols: Dict[str, np.ndarray] = {}
+        for f in FLOAT_FIELDS: self.cols[f] = np.full(capacity, np.nan)
+        for f in INT_FIELDS:   self.cols[f] = np.full(capacity, NO_SIZE, dtype=np.int64)
+        self.ver = np.zeros(capacity, dtype=np.int64)  # md seq del último update de la fila
+        self.seq = 0
+
+    # --- escritura (ingest) ---
+    def row_of(self, sym: str) -> int:
+        """Fila del símbolo; la crea (y crece si hace falta) la primera vez."""
+        row = self._index.get(sym)
+        if row is None:
+            row = len(self._syms)
+            if row >= len(self.ver):
+                self._grow()
+            self._index[sym] = row
+            self._syms.append(sym)
+        return row
+
+    def _grow(self) -> None:
+        cap = max(2*len(self.ver), 1)
+        for f, col in self.cols.items():
+            new = np.full(cap, NO_SIZE if f in INT_FIELDS else np.nan, dtype=col.dtype)
+            new[:len(col)] = col
+            self.cols[f] = new
+        ver = np.zeros(cap, dtype=np.int64); ver[:len(self.ver)] = self.ver
+        self.ver = ver
+
+    def begin(self, row: int) -> None:
+        """Antes de escribir una fila (el store compartido la marca como en escritura)."""
+
+    def touch(self, row: int) -> None:
+        self.seq += 1
+        self.ver[row] = self.seq
+
+    def set_row(self, sym: str, rec: Dict[str, Any]) -> None:
+        row = self.row_of(sym)
+        self.begin(row)
+        try:
+            for f in FLOAT_FIELDS:
+                v = rec.get(f)
+                self.cols[f][row] = np.nan if v is None else float(v)
+            for f in INT_FIELDS:
+                v = rec.get(f)
+                self.cols[f][row] = NO_SIZE if v is None else int(v)
+        finally:
+            self.touch(row)
+
+    # --- lectura vectorizada ---
+    def rows(self, syms: Sequence[str]) -> np.ndarray:
+        """Índices de fila (-1 para símbolos sin datos)."""
+        get = self._index.get
+        return np.fromiter((get(s, -1) for s in syms), dtype=np.int64, count=len(syms))
+
+    def take(self, syms: Sequence[str], fields: Iterable[str] = FLOAT_FIELDS) -> Dict[str, np.ndarray]:
+        """Columnas para `syms` como arrays float; NaN donde no hay dato."""
+        idx = self.rows(syms)
+        miss = idx < 0
+        out = {}
+        for f in fields:
+            v = self.cols[f][np.where(miss, 0, idx)].astype(float)
+            if f in INT_FIELDS: v[v == NO_SIZE] = np.nan
+            v[miss] = np.nan
+            out[f] = v
+        return out
+
+    def version(self, sym: Optional[str]) -> int:
+        row = self._index.get(sym) if sym is not None else None
+        return 0 if row is None else int(self.ver[row])
+
+    # --- vista compatible con dict ---
+    def _record(self, row: int) -> Dict[str, Any]:
+        rec: Dict[str, Any] = {}
+        for f in FLOAT_FIELDS:
+            v = self.cols[f][row]
+            rec[f] = None if v != v else float(v)
+        for f in INT_FIELDS:
+            v = self.cols[f][row]
+            rec[f] = None if v == NO_SIZE else int(v)
+        return rec
+
+    def get(self, sym: str, default: Any = None) -> Any:
+        row = self._index.get(sym)
+        return default if row is None else self._record(row)
+
+    def __getitem__(self, sym: str) -> Dict[str, Any]:
+        row = self._index.get(sym)
+        if row is None: raise KeyError(sym)
+        return self._record(row)
+
+    def __setitem__(self, sym: str, rec: Dict[str, Any]) -> None:
+        self.set_row(sym, rec)
+
+    def __contains__(self, sym: object) -> bool:
+        return sym in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._syms))
+
+    def __len__(self) -> int:
+        return len(self._syms)
+
+    def keys(self) -> List[str]:
+        return list(self._syms)
+
+    def items(self) -> Iterator:
+        return ((s, self._record(i)) for i, s in enumerate(self._syms))
@@ -0,0 +1,127 @@
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional, Tuple
+import numpy as np
+
+BUCKETS: Tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+class RollingHistogram:
+    """Duraciones de una etapa: las últimas `size` muestras (para percentiles)
+    más buckets acumulados desde el arranque (para el scrape)."""
+    def __init__(self, size: int = 1024):
+        self._ring = np.zeros(size)
+        self._n = 0
+        self.buckets = [0]*(len(BUCKETS) + 1)  # el último es +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, v: float) -> None:
+        self._ring[self._n % len(self._ring)] = v
+        self._n += 1
+        self.count += 1
+        self.sum += v
+        for i, b in enumerate(BUCKETS):
+            if v <= b:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, p: float) -> float:
+        n = min(self._n, len(self._ring))
+        return float(np.percentile(self._ring[:n], p)) if n else 0.0
+
+class Metrics:
+    """Timers por etapa de update_all + contadores/gauges; exporta texto Prometheus."""
+    def __init__(self):
+        self.stages: Dict[str, RollingHistogram] = {}
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._rate_ts = time.monotonic()
+        self._rate_count: Optional[int] = None
+        self.msgs_per_s = 0.0
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t)
+
+    def observe(self, name: str, seconds: float) -> None:
+        h = self.stages.get(name)
+        if h is None:
+            with self._lock:
+                h = self.stages.setdefault(name, RollingHistogram())
+        h.observe(seconds)
+
+    def inc(self, name: str, by: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + by
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def update_rate(self, received: int) -> float:
+        """Mensajes/s a partir del contador acumulado de recibidos (EWMA de ~2 s)."""
+        now = time.monotonic()
+        dt = now - self._rate_ts
+        if self._rate_count is None or received < self._rate_count:
+            self._rate_ts, self._rate_count = now, received
+        elif dt >= 0.25:
+            inst = (received - self._rate_count) / dt
+            a = min(dt/2.0, 1.0)
+            self.msgs_per_s += a*(inst - self.msgs_per_s)
+            self._rate_ts, self._rate_count = now, received
+        self.gauges["ingest_msgs_per_second"] = self.msgs_per_s
+        return self.msgs_per_s
+
+    def render_prometheus(self) -> str:
+        out = ["# TYPE panel_stage_seconds histogram"]
+        for name, h in sorted(self.stages.items()):
+            acc = 0
+            for b, c in zip(BUCKETS + (float("inf"),), h.buckets):
+                acc += c
+                le = "+Inf" if b == float("inf") else repr(b)
+                out.append(f'panel_stage_seconds_bucket{{stage="{name}",le="{le}"}} {acc}')
+            out.append(f'panel_stage_seconds_sum{{stage="{name}"}} {h.sum:.6f}')
+            out.append(f'panel_stage_seconds_count{{stage="{name}"}} {h.count}')
+        out.append("# TYPE panel_stage_seconds_recent gauge")
+        for name, h in sorted(self.stages.items()):
+            for q in (50, 90, 99):
+                out.append(f'panel_stage_seconds_recent{{stage="{name}",quantile="0.{q}"}} {h.percentile(q):.6f}')
+        for name, v in sorted(self.counters.items()):
+            out.append(f"# TYPE panel_{name}_total counter")
+            out.append(f"panel_{name}_total {v:g}")
+        for name, v in sorted(self.gauges.items()):
+            out.append(f"# TYPE panel_{name} gauge")
+            out.append(f"panel_{name} {v:g}")
+        return "\n".join(out) + "\n"
+
+    def start_http(self, port: int, host: str = "127.0.0.1") -> None:
+        """Sirve /metrics en texto plano (idempotente; port 0 = desactivado)."""
+        if not port or self._server is not None: return
+        metrics = self
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404); return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            def log_message(self, *args): pass
+        try:
+            self._server = ThreadingHTTPServer((host, port), _Handler)
+        except OSError as e:
+            print(f"[metrics] no se pudo abrir {host}:{port}: {e}")
+            return
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"[metrics] http://{host}:{port}/metrics")
+
+METRICS = Metrics()
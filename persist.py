@@ -0,0 +1,106 @@
+import atexit
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import PERSIST_QUIET_MS, PERSIST_MAX_DELAY_MS
+
+def write_atomic(path: Path, text: str) -> None:
+    """Escribe a un temporal en el mismo directorio y lo renombra: nunca queda un archivo a medias."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            try: tmp.unlink()
+            except OSError: pass
+
+class Persister:
+    """Escrituras de archivos chicos de configuración fuera del loop de Tornado.
+
+    `put()` sólo deja el contenido nuevo en memoria (el último gana); un thread lo
+    baja a disco cuando pasan `quiet` segundos sin cambios (o `max_delay` desde el
+    primer cambio pendiente), de forma atómica y sólo si difiere de lo que ya está
+    escrito. `read()` devuelve lo pendiente, así quien lee ve sus propios cambios.
+    Al salir se baja todo lo pendiente.
+    """
+    def __init__(self, quiet: float = 0.5, max_delay: float = 5.0):
+        self.quiet = quiet
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._io = threading.Lock()  # un solo flush a la vez (thread de fondo o atexit)
+        self._pending: Dict[Path, str] = {}
+        self._inflight: Dict[Path, str] = {}  # tomado por un flush, todavía no renombrado
+        self._written: Dict[Path, str] = {}  # último contenido conocido en disco
+        self._first: Optional[float] = None
+        self._last = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self.writes = 0
+        self.skipped = 0
+
+    def put(self, path: Path, text: str) -> None:
+        with self._cond:
+            now = time.monotonic()
+            self._pending[Path(path)] = text
+            if self._first is None: self._first = now
+            self._last = now
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="persist", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+            self._cond.notify()
+
+    def read(self, path: Path) -> Optional[str]:
+        """Contenido de `path`: lo pendiente si hay, si no lo que está en disco (None si no existe)."""
+        path = Path(path)
+        with self._cond:
+            if path in self._pending: return self._pending[path]
+            if path in self._inflight: return self._inflight[path]
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def flush(self) -> None:
+        with self._io:
+            with self._cond:
+                batch, self._pending, self._first = self._pending, {}, None
+                self._inflight = batch
+            for path, text in batch.items():
+                self._write(path, text)
+            with self._cond:
+                self._inflight = {}
+
+    def _write(self, path: Path, text: str) -> None:
+        if path not in self._written:
+            try: self._written[path] = path.read_text(encoding="utf-8")
+            except Exception: pass
+        if self._written.get(path) == text:
+            self.skipped += 1
+            return
+        try:
+            write_atomic(path, text)
+            self._written[path] = text
+            self.writes += 1
+        except Exception as e:
+            print(f"[persist] no se pudo escribir {path.name}: {e}")
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                now = time.monotonic()
+                due = min(self._last + self.quiet, self._first + self.max_delay)
+                if now < due:
+                    self._cond.wait(due - now)
+                    continue
+            self.flush()
+
+PERSIST = Persister(PERSIST_QUIET_MS/1000.0, PERSIST_MAX_DELAY_MS/1000.0)
@@ -0,0 +1,141 @@
+"""Replay de ticks grabados por journal.TickJournal.
+
+Uso headless:  python replay.py <segmento.bin | directorio> [--cycle 0.5]
+Con la app:    REPLAY_FILE=<segmento o directorio> REPLAY_SPEED=10 panel serve app_panel.py
+"""
+import argparse
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from state import STATE
+from md_buffer import CoalescingBuffer
+from journal import list_segments, read_journal
+from instruments import REGISTRY
+from connection import market_data_handler, drain_queue, subscribe_list
+
+def _expand(paths) -> List[Path]:
+    out: List[Path] = []
+    for p in ([paths] if isinstance(paths, (str, Path)) else paths):
+        p = Path(p)
+        out.extend(list_segments(p) if p.is_dir() else [p])
+    return out
+
+def iter_messages(paths, start: Optional[float] = None,
+                  end: Optional[float] = None) -> Iterator[Tuple[float, Any]]:
+    for seg in _expand(paths):
+        yield from read_journal(seg, start, end)
+
+def enter_replay_mode() -> None:
+    """Prepara STATE para recibir ticks sin broker (sin login ni suscripciones reales)."""
+    STATE.replay = True
+    STATE.connected = False
+    if STATE.msg_queue is None:
+        STATE.msg_queue = CoalescingBuffer()
+
+def _inject(msg: Any) -> None:
+    sym = ((msg or {}).get("instrumentId") or {}).get("symbol")
+    if sym and sym not in STATE.subscribed_set:
+        subscribe_list([sym])
+    market_data_handler(msg)
+
+class Replayer:
+    """Reinyecta los mensajes grabados en market_data_handler, como el WebSocket en vivo.
+
+    `speed` es el factor sobre el tiempo grabado (1 = tiempo real); 0 o negativo
+    reproduce lo más rápido posible.
+    """
+    def __init__(self, paths, speed: float = 1.0, start: Optional[float] = None,
+                 end: Optional[float] = None):
+        self.paths = _expand(paths)
+        self.speed = speed
+        self.start_ts = start
+        self.end_ts = end
+        self.sent = 0
+        self.done = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Replayer":
+        enter_replay_mode()
+        self._thread = threading.Thread(target=self.run, name="replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> int:
+        enter_replay_mode()
+        t0 = w0 = None
+        for ts, msg in iter_messages(self.paths, self.start_ts, self.end_ts):
+            if self._stop.is_set(): break
+            if self.speed > 0:
+                if t0 is None: t0, w0 = ts, time.monotonic()
+                wait = w0 + (ts - t0)/self.speed - time.monotonic()
+                if wait > 0 and self._stop.wait(wait): break
+            _inject(msg)
+            self.sent += 1
+        self.done.set()
+        return self.sent
+
+def run_headless(paths, cycle: float = 0.5, r: float = 60.0, q: float = 0.0, days: int = 30,
+                 calls: Optional[List[str]] = None, puts: Optional[List[str]] = None,
+                 on_cycle: Optional[Callable[[float], None]] = None) -> Dict[str, Any]:
+    """Reproduce sin UI y lo más rápido posible, con ciclos de `update_all` cada `cycle`
+    segundos de tiempo grabado (determinístico). Devuelve los tiempos de cada etapa.
+    Si no se pasan calls/puts se usan todas las opciones GGAL vistas.
+    """
+    from letras import build_letras_df
+    from ggal import build_gal_options_df
+
+    enter_replay_mode()
+    stages: Dict[str, List[float]] = {"drain": [], "letras": [], "opciones": []}
+    sent = cycles = 0
+
+    def _cycle(ts: float):
+        nonlocal cycles
+        t = time.perf_counter(); drain_queue(4000)
+        stages["drain"].append(time.perf_counter() - t)
+        t = time.perf_counter(); build_letras_df()
+        stages["letras"].append(time.perf_counter() - t)
+        opts = [REGISTRY.get(s) for s in STATE.subscribed_order]
+        opts = [i for i in opts if i.kind == "option" and i.underlying == "GGAL"]
+        c = calls if calls is not None else [i.symbol for i in opts if i.is_call]
+        p = puts  if puts  is not None else [i.symbol for i in opts if i.is_put]
+        t = time.perf_counter(); build_gal_options_df(c, p, r, q, days)
+        stages["opciones"].append(time.perf_counter() - t)
+        cycles += 1
+        if on_cycle: on_cycle(ts)
+
+    next_cycle = None
+    wall = time.perf_counter()
+    for ts, msg in iter_messages(paths):
+        if next_cycle is None: next_cycle = ts + cycle
+        while ts >= next_cycle:
+            _cycle(next_cycle); next_cycle += cycle
+        _inject(msg); sent += 1
+    if next_cycle is not None:
+        _cycle(next_cycle)
+    return {"messages": sent, "cycles": cycles, "wall_s": time.perf_counter() - wall,
+            "stages": stages}
+
+def _main():
+    ap = argparse.ArgumentParser(description="Replay headless de un journal de ticks")
+    ap.add_argument("paths", nargs="+")
+    ap.add_argument("--cycle", type=float, default=0.5, help="segundos grabados entre ciclos")
+    ap.add_argument("--r", type=float, default=60.0)
+    ap.add_argument("--q", type=float, default=0.0)
+    ap.add_argument("--days", type=int, default=30)
+    a = ap.parse_args()
+    res = run_headless(a.paths, cycle=a.cycle, r=a.r, q=a.q, days=a.days)
+    print(f"mensajes={res['messages']} ciclos={res['cycles']} wall={res['wall_s']:.2f}s")
+    for name, vals in res["stages"].items():
+        if not vals: continue
+        vals = sorted(vals)
+        p50 = vals[len(vals)//2]*1e3; p99 = vals[min(int(len(vals)*0.99), len(vals)-1)]*1e3
+        print(f"  {name:<9} p50={p50:.3f}ms p99={p99:.3f}ms total={sum(vals):.3f}s")
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,103 @@
+import threading
+import time
+import weakref
+from typing import Any, Callable, Optional
+
+from metrics import METRICS
+
+# Schedulers de las sesiones abiertas (uno por documento Bokeh)
+_SCHEDULERS: "weakref.WeakSet[RenderScheduler]" = weakref.WeakSet()
+
+def notify_data() -> None:
+    """Avisa a todas las sesiones que llegó data. Se llama desde el hilo del WebSocket."""
+    for s in list(_SCHEDULERS):
+        s.notify()
+
+class RenderScheduler:
+    """Corre `render` en el loop de la sesión cuando hay datos nuevos, no por timer fijo.
+
+    - `notify()` es thread-safe (usa `doc.add_next_tick_callback`) y barato si ya hay
+      un render agendado: los avisos se juntan en un solo ciclo.
+    - Entre renders pasan al menos `min_interval` segundos, pero un aviso no espera
+      más de `max_delay` desde que llegó.
+    - Cada render queda "en vuelo" hasta que corre un next-tick posterior: Bokeh lo
+      encola detrás del lock del documento, que retiene mientras escribe los patches
+      del render al websocket. Si hay uno en vuelo se saltea el ciclo y se reintenta
+      (backpressure), sin mirar internos de Bokeh ni de Tornado.
+    - Sin avisos sólo corre un latido cada `idle` segundos (estado, MAE).
+    """
+    def __init__(self, doc: Any, render: Callable[[], None], min_interval: float = 0.1,
+                 max_delay: float = 0.25, idle: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        self.doc = doc
+        self.clock = clock
+        self.render = render
+        self.min_interval = min_interval
+        self.max_delay = max_delay
+        self.idle = idle
+        self._lock = threading.Lock()
+        self._pending_since: Optional[float] = None
+        self._armed = False
+        self._inflight = 0  # renders cuyos patches todavía no salieron
+        self._stopped = False
+        self._last_render = 0.0
+        self.renders = 0
+        self.skips = 0
+
+    def start(self) -> "RenderScheduler":
+        _SCHEDULERS.add(self)
+        self.doc.add_periodic_callback(self._heartbeat, int(self.idle*1000))
+        self.notify()
+        return self
+
+    def stop(self) -> None:
+        self._stopped = True
+        _SCHEDULERS.discard(self)
+
+    def notify(self) -> None:
+        with self._lock:
+            if self._stopped: return
+            if self._pending_since is None: self._pending_since = self.clock()
+            if self._armed: return
+            self._armed = True
+        try:
+            self.doc.add_next_tick_callback(self._arm)
+        except Exception:  # documento ya cerrado
+            self.stop()
+
+    def _arm(self) -> None:
+        now = self.clock()
+        first = self._pending_since if self._pending_since is not None else now
+        delay = min(max(self._last_render + self.min_interval - now, 0.0),
+                    max(first + self.max_delay - now, 0.0))
+        self.doc.add_timeout_callback(self._fire, int(delay*1000))
+
+    def _fire(self) -> None:
+        if self._stopped: return
+        if self._inflight:
+            self.skips += 1
+            METRICS.inc("render_skips")
+            self.doc.add_timeout_callback(self._fire, int(self.min_interval*1000))
+            return
+        with self._lock:
+            self._armed = False
+            waited = self.clock() - self._pending_since if self._pending_since else 0.0
+            self._pending_since = None
+        METRICS.observe("render_wait", waited)
+        self._inflight += 1
+        try:
+            self.render()
+        finally:
+            self._last_render = self.clock()
+            self.renders += 1
+            try:
+                self.doc.add_next_tick_callback(self._settled)
+            except Exception:
+                self._inflight -= 1
+
+    def _settled(self) -> None:
+        """Los patches de un render ya salieron."""
+        self._inflight -= 1
+
+    def _heartbeat(self) -> None:
+        if self.clock() - self._last_render >= self.idle*0.9:
+            self.notify()
@@ -0,0 +1,102 @@
+import math
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+
+try:
+    from scipy.optimize import least_squares
+except Exception:
+    least_squares = None
+
+def svi_total_var(k, params) -> np.ndarray:
+    """SVI raw: w(k) = a + b*(rho*(k-m) + sqrt((k-m)^2 + sigma^2)), k = log(K/F)."""
+    a, b, rho, m, sig = params
+    x = np.asarray(k, dtype=float) - m
+    return a + b*(rho*x + np.sqrt(x*x + sig*sig))
+
+_LOWER = np.array([-1.0, 0.0, -0.999, -2.0, 1e-4])
+_UPPER = np.array([ 5.0, 10.0, 0.999,  2.0, 5.0])
+
+class SmileFitter:
+    """Smile SVI de una cadena (un vencimiento), ajustado de forma incremental.
+
+    Se reajusta sólo si cambiaron al menos `min_changed` cotizaciones (o la fracción
+    `min_changed_frac`) desde el último ajuste, arrancando de los parámetros previos y
+    con a lo sumo `max_nfev` evaluaciones por llamada; si no llegó a converger sigue
+    en la próxima. Entre ajustes se evalúa la curva en log-moneyness con el forward
+    actual, así un movimiento del subyacente no obliga a reajustar.
+    """
+    def __init__(self, min_points: int = 5, min_changed: int = 2, min_changed_frac: float = 0.10,
+                 tol_vol: float = 0.05, max_nfev: int = 30):
+        self.min_points = min_points
+        self.min_changed = min_changed
+        self.min_changed_frac = min_changed_frac
+        self.tol_vol = tol_vol          # en puntos de vol (%)
+        self.max_nfev = max_nfev
+        self.params: Optional[np.ndarray] = None
+        self.pending = False
+        self._fit_quotes: Dict[float, float] = {}
+        self.fits = 0
+        self.skips = 0
+
+    def _changed(self, quotes: Dict[float, float]) -> int:
+        old = self._fit_quotes
+        n = len(set(old) ^ set(quotes))
+        for K, iv in quotes.items():
+            prev = old.get(K)
+            if prev is not None and abs(prev - iv) > self.tol_vol: n += 1
+        return n
+
+    def _fit(self, k: np.ndarray, ivs: np.ndarray, T: float) -> None:
+        w_mkt = (ivs/100.0)**2*T
+        x0 = self.params
+        if x0 is None:
+            x0 = np.array([max(float(w_mkt.min())*0.5, 1e-4), 0.1, -0.3, 0.0, 0.1])
+        x0 = np.clip(x0, _LOWER + 1e-9, _UPPER - 1e-9)
+
+        def resid(p):
+            w = np.maximum(svi_total_var(k, p), 1e-12)
+            return np.sqrt(w/T)*100.0 - ivs
+
+        res = least_squares(resid, x0, bounds=(_LOWER, _UPPER), method="trf", max_nfev=self.max_nfev)
+        if np.all(np.isfinite(res.x)):
+            self.params = res.x
+        self.pending = res.status == 0   # cortó por max_nfev: sigue en el próximo tick
+        self.fits += 1
+
+    def update(self, strikes: Sequence[float], ivs: Sequence[Optional[float]],
+               F: Optional[float], T: float) -> np.ndarray:
+        """IV ajustada (%) para cada strike; NaN si no hay ajuste disponible."""
+        K = np.asarray(strikes, dtype=float)
+        out = np.full(K.shape, np.nan)
+        if least_squares is None or not F or not (F > 0) or not (T > 0) or K.size == 0:
+            return out
+        iv = np.array([np.nan if v is None else v for v in ivs], dtype=float)
+        ok = np.isfinite(iv) & (iv > 0) & (K > 0)
+        quotes = dict(zip(K[ok].tolist(), iv[ok].tolist()))
+        if len(quotes) >= self.min_points:
+            need = max(self.min_changed, int(math.ceil(self.min_changed_frac*len(quotes))))
+            if self.params is None or self.pending or self._changed(quotes) >= need:
+                with np.errstate(all="ignore"):
+                    self._fit(np.log(K[ok]/F), iv[ok], T)
+                self._fit_quotes = quotes
+            else:
+                self.skips += 1
+        if self.params is None:
+            return out
+        with np.errstate(all="ignore"):
+            w = svi_total_var(np.log(np.where(K > 0, K, np.nan)/F), self.params)
+            out = np.where(w > 0, np.sqrt(w/T)*100.0, np.nan)
+        return out
+
+# Un fitter por (T, r, q, vencimiento): cada set de parámetros de la UI y cada código
+# de vencimiento tiene su propio warm start
+_FITTERS: Dict[Tuple[float, float, float, str], SmileFitter] = {}
+
+def smile_for(T: float, r: float, q: float, expiry_code: str = "", max_fitters: int = 16) -> SmileFitter:
+    key = (T, r, q, expiry_code)
+    f = _FITTERS.get(key)
+    if f is None:
+        if len(_FITTERS) >= max_fitters:
+            _FITTERS.pop(next(iter(_FITTERS)))
+        f = _FITTERS[key] = SmileFitter()
+    return f
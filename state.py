@@ -1,14 +1,28 @@
-import queue
-from typing import Any, Dict, List, Optional
+from typing import List, Optional
+from md_store import MarketDataStore
+from md_buffer import CoalescingBuffer
+from book import BookStore
+from history import TickHistory
+from config import MD_DEPTH, HISTORY_LEN, HISTORY_MAX_SYMBOLS
 
 class AppState:
     def __init__(self):
         self.connected: bool = False
-        self.msg_queue: Optional[queue.Queue] = None
-        self.md_count: int = 0
+        self.replay: bool = False  # ticks desde un journal grabado, sin broker
+        self.msg_queue: Optional[CoalescingBuffer] = None
+        self.ingest = None  # ingest.IngestClient si el WebSocket corre en otro proceso
+        self.md_count: int = 0    # mensajes de market data recibidos
+        self.md_applied: int = 0  # updates aplicados al store después de coalescer
         self.subscribed_set: set[str] = set()
         self.subscribed_order: List[str] = []
-        self.md: Dict[str, Dict[str, Any]] = {}
+        # sube con cada alta/baja de suscripción o cambio del listado guardado
+        self.universe_version: int = 0
+        # Top-of-book columnar; md.seq / md.version(sym) versionan los updates
+        self.md: MarketDataStore = MarketDataStore()
+        # Libro L2 (MD_DEPTH niveles) de los mismos símbolos
+        self.book: BookStore = BookStore(MD_DEPTH)
+        # Ring buffers por símbolo con la historia intradiaria del top-of-book
+        self.history: TickHistory = TickHistory(HISTORY_LEN, HISTORY_MAX_SYMBOLS)
         self.saved_calls: List[str] = []
         self.saved_puts: List[str] = []
 
@@ -0,0 +1,120 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from state import STATE
+from metrics import METRICS
+from config import ENV, MD_DEPTH, SNAPSHOT_WORKERS, RECONNECT_MAX_BACKOFF_S
+
+# --- snapshots REST ---
+_POOL: Optional[ThreadPoolExecutor] = None
+_SESSION = None
+_POOL_LOCK = threading.Lock()
+
+def _pool():
+    """Pool de workers acotado + una requests.Session con keep-alive para todos."""
+    global _POOL, _SESSION
+    with _POOL_LOCK:
+        if _POOL is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            _SESSION = requests.Session()
+            ad = HTTPAdapter(pool_connections=1, pool_maxsize=SNAPSHOT_WORKERS)
+            _SESSION.mount("https://", ad); _SESSION.mount("http://", ad)
+            _POOL = ThreadPoolExecutor(max_workers=SNAPSHOT_WORKERS, thread_name_prefix="md-snapshot")
+        return _POOL, _SESSION
+
+def fetch_snapshot(sym: str, session=None) -> Optional[Dict[str, Any]]:
+    """marketData (LA/BI/OF/CL) de `sym` por REST con el token de pyRofex; None si falla."""
+    from pyRofex.components import globals as rfx
+    cfg = rfx.environment_config[ENV]
+    session = session or _pool()[1]
+    params = {"marketId": "ROFX", "symbol": sym, "entries": "LA,BI,OF,CL", "depth": MD_DEPTH}
+    for retry in (True, False):
+        r = session.get(cfg["url"] + "rest/marketdata/get", params=params, timeout=5,
+                        headers={"X-Auth-Token": cfg["token"] or ""},
+                        verify=cfg["ssl"], proxies=cfg["proxies"])
+        if r.status_code == 401 and retry and cfg.get("rest_client") is not None:
+            cfg["rest_client"].update_token(); continue
+        if not r.ok: return None
+        d = r.json()
+        return d.get("marketData") if d.get("status") == "OK" else None
+    return None
+
+def warm_up(symbols: List[str], sink: Callable[[Dict[str, Any]], None]) -> List[Future]:
+    """Pide el snapshot de cada símbolo en paralelo y lo entrega a `sink` como un
+    mensaje "snapshot" con la hora del pedido (el drain lo descarta si ya aplicó un tick
+    del exchange más nuevo). No bloquea."""
+    if not symbols or STATE.replay: return []
+    pool, session = _pool()
+    METRICS.inc("snapshots_requested", len(symbols))
+
+    def one(sym: str) -> None:
+        ts = time.time()
+        try:
+            md = fetch_snapshot(sym, session)
+        except Exception:
+            md = None
+        if not md:
+            METRICS.inc("snapshots_failed"); return
+        sink({"type": "snapshot", "ts": ts,
+              "data": {"instrumentId": {"symbol": sym}, "marketData": md}})
+
+    return [pool.submit(one, s) for s in dict.fromkeys(symbols)]
+
+# --- reconexión ---
+class ConnectionSupervisor:
+    """Vigila el WebSocket y lo reabre con backoff exponencial (hasta `max_backoff` s).
+
+    Al reconectar vuelve a suscribir `STATE.subscribed_order` (o hace la suscripción
+    inicial si el primer intento nunca conectó) y pide snapshots REST de todo, así las tablas no esperan al próximo tick de cada instrumento.
+    `poke()` (desde exception_handler) adelanta el chequeo; `stop()` lo pausa
+    cuando el usuario desconecta a mano.
+    """
+    def __init__(self, check: float = 1.0, backoff: float = 1.0, max_backoff: float = 30.0):
+        self.check = check
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.wanted = False
+        self.reconnects = 0
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ConnectionSupervisor":
+        self.wanted = True
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="pyrofex-supervisor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.wanted = False
+
+    def poke(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        import connection as cx
+        delay = self.backoff
+        while True:
+            self._wake.wait(self.check)
+            self._wake.clear()
+            if not self.wanted or STATE.replay: continue
+            if cx.ws_alive():
+                delay = self.backoff; continue
+            STATE.connected = False
+            print(f"[pyRofex] WebSocket caído, reconectando (espera {delay:.0f}s si falla)")
+            try:
+                cx.reconnect()
+            except Exception as e:
+                print(f"[pyRofex] reconexión fallida: {e}")
+            if cx.ws_alive():
+                self.reconnects += 1
+                METRICS.inc("reconnects")
+                delay = self.backoff
+            else:
+                time.sleep(delay)
+                delay = min(delay*2, self.max_backoff)
+
+SUPERVISOR = ConnectionSupervisor(max_backoff=RECONNECT_MAX_BACKOFF_S)
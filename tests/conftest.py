@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# los módulos del panel viven en la raíz del repo (sin paquete)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,28 @@
+from md_buffer import CoalescingBuffer
+from state import STATE
+from connection import update_md_from_payload
+
+SYM = "MERV - XMEV - S30S5 - 24hs"
+
+def _msg(md):
+    return {"type": "marketData", "data": {"instrumentId": {"symbol": SYM}, "marketData": md}}
+
+def test_empty_side_survives_coalescing_and_clears_book_and_top():
+    update_md_from_payload(_msg({"BI": [{"price": 100, "size": 5}, {"price": 99, "size": 7}],
+                                 "OF": [{"price": 101, "size": 3}]}))
+    buf = CoalescingBuffer()
+    buf.put_nowait(_msg({"LA": {"price": 100.5}}))
+    buf.put_nowait(_msg({"BI": []}))
+    for p in buf.drain():
+        update_md_from_payload(p)
+    px, sz = STATE.book.levels(SYM, "BI")
+    assert px.size == 0 and sz.size == 0
+    rec = STATE.md[SYM]
+    assert rec["BID"] is None and rec["BID_SIZE"] is None
+    assert rec["ASK"] == 101 and rec["LAST"] == 100.5
+    assert list(STATE.book.levels(SYM, "OF")[0]) == [101.0]
+
+def test_vwap_and_depth():
+    update_md_from_payload(_msg({"OF": [{"price": 10, "size": 50}, {"price": 11, "size": 100}]}))
+    assert STATE.book.vwap([SYM], "OF", 100)[0] == 10.5
+    assert STATE.book.depth_qty([SYM], "OF")[0] == 150
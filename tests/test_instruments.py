@@ -0,0 +1,22 @@
+from instruments import classify, InstrumentRegistry
+
+def test_short_symbols_keep_their_kind():
+    # "TICKER - plazo" se clasifica como la forma larga: las letras siguen en la tabla
+    assert classify("S30S5 - 24hs").kind == "letra"
+    eq = classify("GGAL - 24hs")
+    assert eq.kind == "equity" and eq.ticker == "GGAL"
+    assert not eq.is_call and not eq.is_put and eq.strike is None
+    opt = classify("GFGC65025G - 24hs")
+    assert opt.kind == "option" and not opt.is_call and opt.strike is None
+
+def test_register_survives_odd_symbol():
+    reg = InstrumentRegistry()
+    reg.register(["GGAL - 24hs", "MERV - XMEV - GFGC65025G - 24hs"])
+    assert reg.get("GGAL - 24hs").kind == "equity"
+    opt = reg.get("MERV - XMEV - GFGC65025G - 24hs")
+    assert opt.kind == "option" and opt.is_call and opt.strike == 6502.5
+
+def test_long_symbols():
+    assert classify("MERV - XMEV - S30S5 - 24hs").kind == "letra"
+    put = classify("MERV - XMEV - GFGV65025G - 24hs")
+    assert put.is_put and put.underlying == "GGAL" and put.expiry_code == "G"
@@ -0,0 +1,82 @@
+import heapq
+
+from scheduler import RenderScheduler
+
+class FakeDoc:
+    """Imita a Bokeh con un reloj virtual: los next-tick corren con el lock del documento
+    y, si el render mandó patches, el lock sigue tomado `write` segundos mientras se
+    escriben. Los timeouts corren sin esperar el lock: sólo el render en vuelo los frena."""
+    def __init__(self, write: float):
+        self.now = 0.0
+        self.write = write
+        self.patched = False
+        self.writes = []  # (inicio, fin) de cada escritura
+        self._ticks = []
+        self._timers = []
+        self._seq = 0
+        self._busy_until = 0.0
+
+    def clock(self) -> float:
+        return self.now
+
+    def add_next_tick_callback(self, cb):
+        self._ticks.append(cb)
+
+    def add_timeout_callback(self, cb, ms):
+        self._seq += 1
+        heapq.heappush(self._timers, (self.now + ms/1000.0, self._seq, cb))
+
+    def add_periodic_callback(self, cb, ms):
+        pass
+
+    def _call(self, cb):
+        self.patched = False
+        cb()
+        if self.patched:
+            self._busy_until = self.now + self.write
+            self.writes.append((self.now, self._busy_until))
+
+    def run_until(self, t_end: float, every=None, step: float = 0.005):
+        """Avanza el reloj hasta `t_end` corriendo lo que toque; `every()` cada `step` s."""
+        next_every = self.now if every else float("inf")
+        while True:
+            if self._ticks and self.now >= self._busy_until:
+                self._call(self._ticks.pop(0)); continue
+            cands = [next_every]
+            if self._timers: cands.append(self._timers[0][0])
+            if self._ticks: cands.append(self._busy_until)
+            t = min(cands)
+            if t > t_end: self.now = t_end; return
+            self.now = max(self.now, t)
+            if t == next_every:
+                every(); next_every += step
+            elif self._timers and self._timers[0][0] <= self.now:
+                self._call(heapq.heappop(self._timers)[2])
+
+def test_no_render_while_previous_patch_is_writing():
+    doc = FakeDoc(write=0.2)
+    renders = []
+    def render():
+        renders.append(doc.now)
+        doc.patched = True
+    s = RenderScheduler(doc, render, min_interval=0.02, max_delay=0.05, idle=60, clock=doc.clock).start()
+    doc.run_until(1.0, every=s.notify)
+    doc.run_until(1.3)
+    s.stop()
+    # avisos cada 5 ms durante 1 s: uno de arranque y después uno por escritura de 0,2 s
+    assert len(renders) == 6
+    for t in renders:
+        assert not any(a < t < b for a, b in doc.writes)
+    assert all(b - a >= 0.2 - 1e-9 for a, b in zip(renders, renders[1:]))
+
+def test_inflight_render_is_skipped_until_settled():
+    doc = FakeDoc(write=0.0)
+    n = []
+    s = RenderScheduler(doc, lambda: n.append(1), min_interval=0.01, max_delay=0.01, idle=60, clock=doc.clock)
+    s._inflight = 1             # patch del render anterior todavía sin salir
+    s._pending_since = doc.now; s._armed = True
+    s._fire()
+    assert n == [] and s.skips == 1
+    s._settled()
+    doc.run_until(0.05)         # el reintento corre solo
+    assert n == [1] and s._inflight == 0
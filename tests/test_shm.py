@@ -0,0 +1,59 @@
+import os
+import pytest
+
+import connection as cx
+from ingest import IngestClient
+from md_buffer import CoalescingBuffer
+from md_shm import SharedMarketDataStore, owner_alive
+from state import STATE
+
+SYM = "MERV - XMEV - GGAL - 24hs"
+
+def _msg(md):
+    return {"type": "marketData", "data": {"instrumentId": {"symbol": SYM}, "marketData": md}}
+
+@pytest.fixture
+def shm():
+    name = f"prmd_test_{os.getpid()}"
+    store = SharedMarketDataStore(name, 16, create=True)
+    prev, STATE.md = STATE.md, store
+    yield store
+    STATE.md = prev
+    store.close(unlink=True)
+
+def test_bad_message_closes_seqlock_and_drain_goes_on(shm):
+    STATE.msg_queue = CoalescingBuffer()
+    STATE.msg_queue.put_nowait(_msg({"BI": ["roto"]}))
+    STATE.msg_queue.put_nowait(_msg({"LA": {"price": 7000}}))
+    STATE.msg_queue.put_nowait({"type": "marketData",
+                                "data": {"instrumentId": {"symbol": "OTRO"}, "marketData": {"LA": {"price": 1}}}})
+    assert cx.drain_queue() == 2
+    assert shm.lock[shm.row_of(SYM)] % 2 == 0
+    assert shm["OTRO"]["LAST"] == 1
+    STATE.msg_queue = None
+
+def test_non_owner_close_keeps_segment(shm):
+    assert owner_alive(shm)
+    other = SharedMarketDataStore(shm.shm.name, 16)
+    cli = IngestClient(name=shm.shm.name, capacity=16)
+    cli.store = other
+    cli.close()
+    again = SharedMarketDataStore(shm.shm.name, 16)  # sigue existiendo
+    again.close()
+
+def test_control_channel_only_accepts_whitelisted_json():
+    from ingest import _decode, _encode
+    assert _decode(_encode(("subscribe", [SYM]))) == ("subscribe", [SYM])
+    assert _decode(_encode(("stop",))) == ("stop",)
+    assert _decode(_encode(("exec", "x"))) is None
+    assert _decode(_encode(("subscribe", [1]))) is None
+    assert _decode(b"\x80\x04K\x01.") is None  # un pickle no pasa
+
+def test_owner_key_is_readable_by_workers():
+    name = f"prmd_key_{os.getpid()}"
+    key = os.urandom(16).hex().encode("ascii")
+    own = SharedMarketDataStore(name, 8, create=True, key=key)
+    other = SharedMarketDataStore(name, 8)
+    assert other.key == key
+    other.close()
+    own.close(unlink=True)
@@ -0,0 +1,30 @@
+from benchmarks.fixtures import reset_state, load_underlyings, option_chain, option_quote, md_message, payload
+from connection import update_md_from_payload
+from ggal import build_gal_options_df
+import smile
+
+def _chain(code: str, n: int = 12):
+    calls, puts = option_chain(n)
+    return [c.replace("OC - ", f"{code} - ") for c in calls], [p.replace("OC - ", f"{code} - ") for p in puts]
+
+def test_one_smile_per_expiry_code():
+    reset_state(); load_underlyings(); smile._FITTERS.clear()
+    c1, p1 = _chain("OC")
+    c2, p2 = _chain("DI", 9)  # otra grilla: los strikes no coinciden con los de OC
+    for s in c1 + p1 + c2 + p2:
+        update_md_from_payload(payload(md_message(s, option_quote(s))))
+    build_gal_options_df(c1 + c2, p1 + p2, 60.0, 0.0, 30)
+    assert {k[3] for k in smile._FITTERS} == {"OC", "DI"}
+
+def test_pending_fit_resumes_without_new_ticks():
+    from engine import ENGINE
+    reset_state(); load_underlyings(); smile._FITTERS.clear(); ENGINE._opt.clear()
+    key = (30/365.0, 0.6, 0.0, "OC")
+    smile._FITTERS[key] = smile.SmileFitter(max_nfev=1)  # corta antes de converger
+    calls, puts = _chain("OC")
+    for s in calls + puts:
+        update_md_from_payload(payload(md_message(s, option_quote(s))))
+    df1 = ENGINE.options_df(calls, puts, 60.0, 0.0, 30)
+    assert df1.attrs["smile_pending"]
+    df2 = ENGINE.options_df(calls, puts, 60.0, 0.0, 30)  # mismo md.seq: igual se reajusta
+    assert df2 is not df1 and smile._FITTERS[key].fits == 2
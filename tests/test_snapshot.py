@@ -0,0 +1,32 @@
+import connection as cx
+from md_buffer import CoalescingBuffer
+from state import STATE
+
+SYM = "MERV - XMEV - GFGC6500OC - 24hs"
+
+def _snap(md, ts=0.0):
+    return {"type": "snapshot", "ts": ts, "data": {"instrumentId": {"symbol": SYM}, "marketData": md}}
+
+def _tick(md, ts):
+    return {"type": "marketData", "data": {"instrumentId": {"symbol": SYM}, "marketData": md, "timestamp": ts}}
+
+def test_snapshots_are_not_evicted_by_other_messages():
+    buf = CoalescingBuffer(max_other=10)
+    for i in range(50):
+        buf.put_snapshot(_snap({"LA": {"price": i}}))
+        buf.put_nowait({"type": "error", "data": i})
+    out = buf.drain()
+    assert sum(p["type"] == "snapshot" for p in out) == 50
+    assert buf.qsize() == 0
+
+def test_stale_snapshot_uses_exchange_time():
+    STATE.msg_queue = CoalescingBuffer()
+    cx.update_md_from_payload(_tick({"LA": {"price": 120}}, 2_000))
+    # pedido después del tick (hora local), pero el exchange lo fecha antes: se descarta
+    STATE.msg_queue.put_snapshot(_snap({"LA": {"price": 110, "date": 1_000}}, ts=1e9))
+    cx.drain_queue()
+    assert STATE.md[SYM]["LAST"] == 120
+    STATE.msg_queue.put_snapshot(_snap({"LA": {"price": 130, "date": 3_000}}))
+    cx.drain_queue()
+    assert STATE.md[SYM]["LAST"] == 130
+    STATE.msg_queue = None
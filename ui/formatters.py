@@ -0,0 +1,44 @@
+from panel.io import JSCode
+
+# Formatters de Tabulator que corren en el browser: las tablas viajan con números
+# crudos (NaN = sin dato) y acá se declara cómo mostrarlos.
+
+_NUM_JS = """function(cell){
+  var v = cell.getValue();
+  if (v === null || v === undefined || v === "" || isNaN(v)) return "";
+  v = Number(v);
+  var p = Math.abs(v).toFixed(%(dec)d).split(".");
+  if (%(group)s) p[0] = p[0].replace(/\\B(?=(\\d{3})+(?!\\d))/g, ".");
+  var s = (v < 0 ? "-" : (%(plus)s ? "+" : "")) + p.join(",");
+  if (%(color)s) {
+    var bg = v > 0 ? "rgba(46,204,113,.22)" : (v < 0 ? "rgba(231,76,60,.22)" : "transparent");
+    return "<span class='iv-cell' style='background:" + bg + "'>" + s + "</span>";
+  }
+  return s;
+}"""
+
+def ar_number(dec: int, group: bool = True, signed: bool = False, colored: bool = False) -> JSCode:
+    """Número con separadores argentinos (1.234,56); `signed` antepone '+', `colored` pinta por signo."""
+    js = _NUM_JS % {"dec": dec, "group": "true" if group else "false",
+                    "plus": "true" if signed else "false", "color": "true" if colored else "false"}
+    return JSCode(js)
+
+# Escala verde -> rojo: la celda sólo lleva su valor (--iv) y el color lo calcula el CSS
+# de .iv-heat con el rango de la tabla (--iv-lo/--iv-hi, ver iv_range_css). Si cambia el
+# rango el browser repinta todas las celdas sin que viaje ninguna.
+IV_HEAT = JSCode("""function(cell){
+  var v = cell.getValue();
+  if (v === null || v === undefined || isNaN(v)) return "";
+  return "<span class='iv-cell iv-heat' style='--iv:" + v + "'>" + v.toFixed(2).replace(".", ",") + "</span>";
+}""")
+
+def iv_range_css(lo: float, hi: float) -> str:
+    """Stylesheet de la tabla con el rango de la escala de IV."""
+    return f":host {{ --iv-lo: {lo:.4f}; --iv-hi: {hi:.4f}; }}"
+
+# Epoch (s) -> HH:MM:SS hora de Buenos Aires
+AR_TIME = JSCode("""function(cell){
+  var v = cell.getValue();
+  if (!v || isNaN(v)) return "";
+  return new Date(v*1000).toLocaleTimeString("es-AR", {hour12: false, timeZone: "America/Argentina/Buenos_Aires"});
+}""")
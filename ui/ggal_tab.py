@@ -2,7 +2,9 @@ import panel as pn
 import pandas as pd
 from state import STATE
 from utils import save_panel_cfg
-from ggal import is_call_code, is_put_code, refresh_gal_option_lists, ensure_underlying_sub
+from ui.formatters import IV_HEAT, iv_range_css
+from config import BOOK_QTY
+from ggal import is_call_code, is_put_code, refresh_gal_option_lists, ensure_underlying_sub, GREEK_COLS, BOOK_COLS
 
 def underlying_short(symbol: str) -> str:
     return symbol.split(" - ")[2].strip() if " - " in symbol else symbol
@@ -18,22 +20,26 @@ under_bar = pn.Row(pn.layout.HSpacer(), under_md, pn.layout.HSpacer(),
 
 ggal_cols_config = [
     {"title":"CALL Ask","field":"CALL Ask","hozAlign":"center","cssClass":"tab-price"},
-    {"title":"IV Ask (CALL) %","field":"IV Ask (CALL)","formatter":"html","hozAlign":"center"},
+    {"title":"IV Ask (CALL) %","field":"IV Ask (CALL)","formatter":IV_HEAT,"hozAlign":"center"},
     {"title":"Notas","field":"Notas","hozAlign":"center"},
-    {"title":"IV Bid (CALL) %","field":"IV Bid (CALL)","formatter":"html","hozAlign":"center"},
+    {"title":"IV Bid (CALL) %","field":"IV Bid (CALL)","formatter":IV_HEAT,"hozAlign":"center"},
     {"title":"CALL Bid","field":"CALL Bid","hozAlign":"center","cssClass":"tab-price"},
     {"title":"Pos CALLs","field":"Pos CALLs","hozAlign":"center"},
     {"title":"Strike","field":"Strike","hozAlign":"center"},
+    {"title":"IV Fit %","field":"IV Fit","hozAlign":"center"},
+    {"title":"Resid. (pts)","field":"Residuo","hozAlign":"center"},
     {"title":"Pos PUTs","field":"Pos PUTs","hozAlign":"center"},
     {"title":"PUT Ask","field":"PUT Ask","hozAlign":"center","cssClass":"tab-price"},
-    {"title":"IV Ask (PUT) %","field":"IV Ask (PUT)","formatter":"html","hozAlign":"center"},
+    {"title":"IV Ask (PUT) %","field":"IV Ask (PUT)","formatter":IV_HEAT,"hozAlign":"center"},
     {"title":"Notas 2","field":"Notas 2","hozAlign":"center"},
-    {"title":"IV Bid (PUT) %","field":"IV Bid (PUT)","formatter":"html","hozAlign":"center"},
+    {"title":"IV Bid (PUT) %","field":"IV Bid (PUT)","formatter":IV_HEAT,"hozAlign":"center"},
     {"title":"PUT Bid","field":"PUT Bid","hozAlign":"center","cssClass":"tab-price"},
 ]
+# columnas opcionales (sólo aparecen si el df las trae)
+ggal_cols_config += [{"title":c,"field":c,"hozAlign":"center"} for c in GREEK_COLS + BOOK_COLS]
 
 ggal_tabulator = pn.widgets.Tabulator(
-    pd.DataFrame(columns=[c["field"] for c in ggal_cols_config]),
+    pd.DataFrame(columns=[c["field"] for c in ggal_cols_config if c["field"] not in GREEK_COLS + BOOK_COLS]),
     pagination=None, selectable=False, layout="fit_data_table", height=240,
     configuration={
         "columnDefaults": {
@@ -50,9 +56,21 @@ ggal_tabulator = pn.widgets.Tabulator(
 
 ggal_wrap = pn.Column(ggal_tabulator, css_classes=["tbl-ggal"], sizing_mode="stretch_width")
 
+_IV_RANGE: tuple = ()
+
+def set_iv_range(lo: float, hi: float) -> None:
+    """Rango de la escala de color de IV: un stylesheet de la tabla, sólo si cambió."""
+    global _IV_RANGE
+    rng = (round(lo, 2), round(hi, 2))
+    if rng == _IV_RANGE: return
+    _IV_RANGE = rng
+    ggal_tabulator.stylesheets = [iv_range_css(*rng)]
+
 days_input = pn.widgets.IntInput(name="Días a Vto", value=30, step=1, width=120)
 r_input    = pn.widgets.FloatInput(name="Tasa libre (anual %)", value=60.0, step=0.25, width=160)
 q_input    = pn.widgets.FloatInput(name="Div. yield (anual %)", value=0.0, step=0.1, width=160)
+greeks_cb  = pn.widgets.Checkbox(name="Griegas (al mid)", value=False, width=140, margin=(28,0,0,10))
+book_cb    = pn.widgets.Checkbox(name=f"Libro (VWAP {BOOK_QTY:g})", value=False, width=150, margin=(28,0,0,10))
 
 calls_ms = pn.widgets.MultiSelect(name="CALLs GGAL", options=[], value=[], size=10, width=520)
 puts_ms  = pn.widgets.MultiSelect(name="PUTs GGAL",  options=[], value=[], size=10, width=520)
@@ -103,6 +121,6 @@ ggal_tab = pn.Column(
     pn.Row(btn_sel_calls, btn_sel_puts, btn_sel_all, margin=(0,0,0,0)),
     pn.Row(calls_ms, puts_ms, margin=(0,0,0,0)),
     pn.Spacer(height=6),
-    pn.Row(days_input, r_input, q_input, margin=(0,0,0,0)),
+    pn.Row(days_input, r_input, q_input, greeks_cb, book_cb, margin=(0,0,0,0)),
     margin=(0,0,0,0)
 )
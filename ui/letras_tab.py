@@ -1,30 +1,43 @@
 import panel as pn
 import pandas as pd
-from letras import LETRAS_CHART
+from letras import LETRAS_CHART, LETRAS_BOOK_COLS
+from config import BOOK_QTY
+from ui.formatters import ar_number, AR_TIME
+
+_PRICE = ar_number(3)
+_PCT   = ar_number(2, group=False)
+_VAR   = ar_number(2, group=False, signed=True, colored=True)
+_MONEY = ar_number(2)
+_VOL   = ar_number(0)
 
 letras_cols_config = [
     {"title":"Instrumento","field":"Instrumento","hozAlign":"center"},
-    {"title":"Vol.C","field":"Vol.C","hozAlign":"center","cssClass":"tab-num"},
-    {"title":"Compra","field":"Compra","hozAlign":"center","cssClass":"tab-price"},
-    {"title":"Venta","field":"Venta","hozAlign":"center","cssClass":"tab-price"},
-    {"title":"Vol.V","field":"Vol.V","hozAlign":"center","cssClass":"tab-num"},
-    {"title":"Últ","field":"Últ","hozAlign":"center","cssClass":"tab-price"},
-    {"title":"Var","field":"Var","formatter":"html","hozAlign":"center"},
-    {"title":"Var %","field":"Var %","formatter":"html","hozAlign":"center"},
-    {"title":"Falta (%)","field":"Por Ganar","hozAlign":"center"},
-    {"title":"TNA (%)","field":"TNA","hozAlign":"center"},
-    {"title":"TEA (%)","field":"TEA","hozAlign":"center"},
+    {"title":"Vol.C","field":"Vol.C","formatter":_VOL,"hozAlign":"center","cssClass":"tab-num"},
+    {"title":"Compra","field":"Compra","formatter":_PRICE,"hozAlign":"center","cssClass":"tab-price"},
+    {"title":"Venta","field":"Venta","formatter":_PRICE,"hozAlign":"center","cssClass":"tab-price"},
+    {"title":"Vol.V","field":"Vol.V","formatter":_VOL,"hozAlign":"center","cssClass":"tab-num"},
+    {"title":"Últ","field":"Últ","formatter":_PRICE,"hozAlign":"center","cssClass":"tab-price"},
+    {"title":"Var","field":"Var","formatter":_VAR,"hozAlign":"center"},
+    {"title":"Var %","field":"Var %","formatter":_VAR,"hozAlign":"center"},
+    {"title":"Falta (%)","field":"Por Ganar","formatter":_PCT,"hozAlign":"center"},
+    {"title":"TNA (%)","field":"TNA","formatter":_PCT,"hozAlign":"center"},
+    {"title":"TEA (%)","field":"TEA","formatter":_PCT,"hozAlign":"center"},
     {"title":"VTO","field":"VTO","hozAlign":"center"},
-    {"title":"DIAS","field":"DIAS","hozAlign":"center"},
-    {"title":"FINISH","field":"FINISH","hozAlign":"center"},
-    {"title":"MEP","field":"MEP","hozAlign":"center"},
-    {"title":"Banda","field":"Banda Sup","hozAlign":"center"},
-    {"title":"% s/ banda","field":"% sobre banda","hozAlign":"center"},
-    {"title":"Último","field":"Último cambio","hozAlign":"center"},
+    {"title":"DIAS","field":"DIAS","formatter":ar_number(0, group=False),"hozAlign":"center"},
+    {"title":"FINISH","field":"FINISH","formatter":_MONEY,"hozAlign":"center"},
+    {"title":"MEP","field":"MEP","formatter":_MONEY,"hozAlign":"center"},
+    {"title":"Banda","field":"Banda Sup","formatter":_MONEY,"hozAlign":"center"},
+    {"title":"% s/ banda","field":"% sobre banda","formatter":ar_number(2, group=False, signed=True),"hozAlign":"center"},
+    {"title":"Último","field":"Último cambio","formatter":AR_TIME,"hozAlign":"center"},
+    # libro (opcionales): profundidad acumulada y VWAP para BOOK_QTY nominales
+    {"title":"Prof. C","field":"Prof. C","formatter":_VOL,"hozAlign":"center","cssClass":"tab-num"},
+    {"title":f"VWAP C ({BOOK_QTY:g})","field":"VWAP C","formatter":_PRICE,"hozAlign":"center","cssClass":"tab-price"},
+    {"title":f"VWAP V ({BOOK_QTY:g})","field":"VWAP V","formatter":_PRICE,"hozAlign":"center","cssClass":"tab-price"},
+    {"title":"Prof. V","field":"Prof. V","formatter":_VOL,"hozAlign":"center","cssClass":"tab-num"},
 ]
 
 letras_tabulator = pn.widgets.Tabulator(
-    pd.DataFrame(columns=[c["field"] for c in letras_cols_config]),
+    pd.DataFrame(columns=[c["field"] for c in letras_cols_config if c["field"] not in LETRAS_BOOK_COLS]),
     pagination=None, selectable=False, layout="fit_data_table", height=300,
     configuration={
         "columnDefaults": {
@@ -45,11 +58,12 @@ letras_md = pn.pane.Markdown(
     styles={"margin":"0","width":"100%","text-align":"center","font-size":"18px","line-height":"1.15","white-space":"nowrap"}
 )
 letras_bar = pn.Row(letras_md, sizing_mode="stretch_width", height=28, margin=(0, 0, 12, 0))
+letras_book_cb = pn.widgets.Checkbox(name=f"Libro (VWAP {BOOK_QTY:g})", value=False, width=150)
 letras_wrap = pn.Column(letras_tabulator, css_classes=["tbl-letras"], sizing_mode="stretch_width")
 
 letras_tab = pn.Column(
     letras_bar,
-    pn.pane.Markdown("### Letras"),
+    pn.Row(pn.pane.Markdown("### Letras"), letras_book_cb),
     letras_wrap,
     pn.Spacer(height=8),
     pn.pane.Markdown("#### Curva TEA vs Días a Vto"),
@@ -2,6 +2,7 @@ import panel as pn
 from utils import parse_input_tickers, load_saved_tickers, save_tickers_list
 from connection import subscribe_list, unsubscribe_all
 from ui.toolbar import _refresh_status
+from state import STATE
 
 subs_text = pn.widgets.TextAreaInput(
     name="Listado de tickers (uno por línea o separados por coma):",
@@ -20,7 +21,10 @@ btn_load_and_sub   = pn.widgets.Button(name="Cargar guardado y suscribir", butto
 
 btn_subscribe_list.on_click(lambda e: (subscribe_list(parse_input_tickers(subs_text.value)), _refresh_status()))
 btn_unsub_all_main.on_click(lambda e: (unsubscribe_all(), _refresh_status()))
-btn_save_list.on_click(lambda e: save_tickers_list(parse_input_tickers(subs_text.value)))
+def _save_list(e):
+    save_tickers_list(parse_input_tickers(subs_text.value))
+    STATE.universe_version += 1
+btn_save_list.on_click(_save_list)
 
 def _load_and_sub(e):
     saved = load_saved_tickers()
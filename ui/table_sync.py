@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import panel as pn
+from typing import Any, Dict, List, Optional, Tuple
+
+def _py(v: Any) -> Any:
+    return v.item() if isinstance(v, np.generic) else v
+
+def _changed(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Máscara de celdas distintas; NaN/None contra NaN/None cuenta como igual."""
+    try:
+        same = np.asarray(a == b, dtype=bool)
+    except Exception:
+        same = np.array([x == y for x, y in zip(a, b)], dtype=bool)
+    return ~(same | (pd.isna(a) & pd.isna(b)))
+
+def push_frame(tab: pn.widgets.Tabulator, df: pd.DataFrame, key: Optional[str] = None) -> int:
+    """Lleva `tab` a `df` mandando al browser sólo las celdas que cambiaron.
+
+    Reenvía la tabla entera sólo si cambia el set de filas: columnas, cantidad
+    de filas o la columna `key`. Devuelve la cantidad de celdas enviadas.
+    """
+    old = tab.value
+    if (old is None or list(old.columns) != list(df.columns) or len(old) != len(df)
+            or (key is not None and _changed(old[key].to_numpy(), df[key].to_numpy()).any())):
+        tab.value = df.copy()  # patch() muta tab.value: no compartir el frame del caller
+        return df.size
+
+    patch: Dict[str, List[Tuple[int, Any]]] = {}
+    for col in df.columns:
+        new = df[col].to_numpy()
+        pos = np.flatnonzero(_changed(old[col].to_numpy(), new))
+        if pos.size:
+            patch[col] = [(int(i), _py(new[i])) for i in pos]
+    if patch:
+        tab.patch(patch, as_index=False)
+    return sum(len(v) for v in patch.values())
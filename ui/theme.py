@@ -37,6 +37,10 @@ pn.config.raw_css.append("""
 .var-red   { color: #e74c3c !important; font-weight: 700; }
 .var-zero  { color:#000 !important; font-weight:700; }
 .iv-cell   { border-radius: 4px; padding: 0 6px; display: inline-block; width: 100%; }
+.iv-heat   {
+    --t: clamp(0, calc((var(--iv) - var(--iv-lo, 10)) / max(var(--iv-hi, 150) - var(--iv-lo, 10), 0.0001)), 1);
+    background: rgb(calc(46 + var(--t)*185), calc(204 - var(--t)*128), calc(113 - var(--t)*53));
+}
 .ggal-bar  { display:flex; justify-content:center; align-items:center; padding:2px 0; }
 .ggal-bar p{ margin:0; }
 """)
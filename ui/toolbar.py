@@ -1,5 +1,6 @@
 import panel as pn
 from state import STATE
+from metrics import METRICS
 from connection import connect_pyrofex, disconnect_pyrofex, unsubscribe_all
 
 btn_connect    = pn.widgets.Button(name="Conectar",    button_type="success",  width=110, height=32)
@@ -11,9 +12,20 @@ status_label   = pn.pane.Markdown(
 )
 
 def _refresh_status():
+    buf, ing = STATE.msg_queue, STATE.ingest
+    if ing is not None:  # la cola vive en el proceso de ingest
+        depth, rate = ing.queue_depth(), METRICS.update_rate(ing.received())
+    else:
+        depth = buf.qsize() if buf else 0
+        rate = METRICS.update_rate(buf.received) if buf else 0.0
+    METRICS.set_gauge("queue_depth", depth)
+    METRICS.set_gauge("md_received", STATE.md_count)
     status_label.object = (f"**Conectado:** {'✅' if STATE.connected else '❌'}"
                            f"  &nbsp;&nbsp;|&nbsp;&nbsp; **Suscriptos:** {len(STATE.subscribed_set)}"
-                           f"  &nbsp;&nbsp;|&nbsp;&nbsp; **MD:** {STATE.md_count}")
+                           f"  &nbsp;&nbsp;|&nbsp;&nbsp; **MD:** {STATE.md_count}"
+                           f"  &nbsp;&nbsp;|&nbsp;&nbsp; **Cola:** {depth}"
+                           f"  &nbsp;&nbsp;|&nbsp;&nbsp; **Msg/s:** {rate:.0f}"
+                           f"  &nbsp;&nbsp;|&nbsp;&nbsp; **Overruns:** {int(METRICS.counters.get('cycle_overruns', 0))}")
 
 btn_connect.on_click(lambda e: (connect_pyrofex(), _refresh_status()))
 btn_disconnect.on_click(lambda e: (disconnect_pyrofex(), _refresh_status()))
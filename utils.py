@@ -5,6 +5,7 @@ from datetime import date
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from config import SAVE_TICKERS, SAVE_PANEL_CFG
+from persist import PERSIST
 
 def to_float(x):
     if x is None or (isinstance(x, float) and pd.isna(x)):
@@ -39,8 +40,9 @@ def clean_symbol(symbol: str) -> str:
 
 def load_saved_tickers() -> List[str]:
     try:
-        if SAVE_TICKERS.exists():
-            return [ln.strip() for ln in SAVE_TICKERS.read_text(encoding="utf-8").splitlines() if ln.strip()]
+        text = PERSIST.read(SAVE_TICKERS)
+        if text is not None:
+            return [ln.strip() for ln in text.splitlines() if ln.strip()]
     except Exception:
         pass
     return []
@@ -48,14 +50,15 @@ def load_saved_tickers() -> List[str]:
 def save_tickers_list(tickers: List[str]) -> None:
     try:
         norm = [t for t in [t.strip() for t in tickers] if t]
-        SAVE_TICKERS.write_text("\n".join(norm), encoding="utf-8")
+        PERSIST.put(SAVE_TICKERS, "\n".join(norm))
     except Exception:
         pass
 
 def load_panel_cfg(state_obj) -> None:
-    if SAVE_PANEL_CFG.exists():
+    text = PERSIST.read(SAVE_PANEL_CFG)
+    if text is not None:
         try:
-            d = json.loads(SAVE_PANEL_CFG.read_text(encoding="utf-8"))
+            d = json.loads(text)
             state_obj.saved_calls = d.get("ggal_calls", [])
             state_obj.saved_puts  = d.get("ggal_puts", [])
         except Exception:
@@ -63,10 +66,10 @@ def load_panel_cfg(state_obj) -> None:
 
 def save_panel_cfg(state_obj) -> None:
     try:
-        SAVE_PANEL_CFG.write_text(json.dumps({
-            "ggal_calls": state_obj.saved_calls,
-            "ggal_puts":  state_obj.saved_puts
-        }, ensure_ascii=False, indent=2), encoding="utf-8")
+        PERSIST.put(SAVE_PANEL_CFG, json.dumps({
+            "ggal_calls": list(state_obj.saved_calls),
+            "ggal_puts":  list(state_obj.saved_puts)
+        }, ensure_ascii=False, indent=2))
     except Exception:
         pass
 